@@ -0,0 +1,293 @@
+"""
+Export many Gravity Forms entries in one browser session.
+
+Entry IDs can be given as:
+- single ids:        29990
+- comma lists:       29990,29991,29995
+- inclusive ranges:  29980-29993
+- files (one per line, same syntax allowed): @ids.txt
+
+Flow:
+- Build one driver and log in once (cached session reused when valid)
+- For every entry: open_entry_by_id, then parse visible text (default)
+  or scrape the label/value rows (--mode fields)
+- Stream all results into one consolidated pair of files:
+  entries_<timestamp>.jsonl (one object per entry) and
+  entries_<timestamp>.csv (entry_id,label,value)
+- With ENTRY_STORE set, results are upserted into the SQLite entry store
+  instead (see entry_store)
+- Failed or empty entries are retried (MAX_RETRIES, exponential backoff;
+  see retry) and a crashed Chrome is replaced without logging in again
+- Every exported entry is checkpointed in the run journal (JOURNAL_FILE);
+  --resume continues the last run, replaying what it already exported
+- --workers N spreads the entries over N Chrome workers (see worker_pool)
+- --fetch http downloads entry pages with requests instead (see http_fetch);
+  --workers then sets the number of concurrent HTTP requests
+"""
+import argparse
+import csv
+import itertools
+import json
+import os
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from config import Config
+from export_entry_by_text import parse_text_lines, read_visible_text, wait_for_entry_content
+from entry_store import EntryStore
+from export_first_entry import get_form_id_from_admin_url, open_entry_by_id, scrape_entry_fields
+from journal import PARSED, Journal, open_journal
+from login_agent import navigation_stats
+from retry import DriverSession, EmptyEntryError, retry_call
+from tracing import traced
+
+
+def _expand_token(token: str) -> List[str]:
+    token = token.strip()
+    if not token or token.startswith("#"):
+        return []
+    if token.startswith("@"):
+        return read_id_file(token[1:])
+    if "-" in token:
+        start_s, end_s = token.split("-", 1)
+        start, end = int(start_s), int(end_s)
+        step = 1 if end >= start else -1
+        return [str(i) for i in range(start, end + step, step)]
+    if not token.isdigit():
+        raise ValueError(f"Invalid entry id: {token!r}")
+    return [token]
+
+
+def read_id_file(path: str) -> List[str]:
+    ids: List[str] = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            ids.extend(parse_entry_ids([line]))
+    return ids
+
+
+def parse_entry_ids(specs: Iterable[str]) -> List[str]:
+    """Expand id lists, ranges and @files; keeps first-seen order, drops duplicates."""
+    seen = set()
+    ids: List[str] = []
+    for spec in specs:
+        for token in spec.replace(",", " ").split():
+            for entry_id in _expand_token(token):
+                if entry_id not in seen:
+                    seen.add(entry_id)
+                    ids.append(entry_id)
+    return ids
+
+
+@traced("wp.extract", entry_arg="entry_id", outcome=lambda record: "ok" if len(record) > 1 else "empty")
+def extract_entry(driver, entry_id: str, mode: str = "text") -> Dict[str, str]:
+    open_entry_by_id(driver, entry_id)
+    if mode == "fields":
+        pairs = scrape_entry_fields(driver)
+    else:
+        wait_for_entry_content(driver)
+        pairs = parse_text_lines(read_visible_text(driver).splitlines())
+    record: Dict[str, str] = {k: v for k, v in pairs}
+    record.setdefault("Entry Id", entry_id)
+    if Config.LEAN_LOADING:
+        report_navigation(driver, entry_id)
+    return record
+
+
+def report_navigation(driver, entry_id: str) -> None:
+    stats = navigation_stats(driver)
+    print(f"Entry {entry_id}: {stats['requests']} requests, {stats['blocked']} blocked, "
+          f"{stats['bytes'] / 1024:.0f} KiB received")
+
+
+def extract_entry_with_retry(browser: DriverSession, entry_id: str, mode: str = "text") -> Dict[str, str]:
+    """extract_entry under the retry policy; an empty page counts as a retryable failure."""
+    def _attempt() -> Dict[str, str]:
+        record = extract_entry(browser.driver, entry_id, mode)
+        if len(record) <= 1:
+            raise EmptyEntryError("no fields found")
+        return record
+
+    return retry_call(_attempt, f"Entry {entry_id}", browser.restart)
+
+
+def export_entries(browser: DriverSession, entry_ids: Iterable[str], mode: str = "text") -> Iterator[Tuple[str, Dict[str, str]]]:
+    for entry_id in entry_ids:
+        try:
+            yield entry_id, extract_entry_with_retry(browser, entry_id, mode)
+        except Exception as e:
+            print(f"Entry {entry_id} failed: {e}")
+            yield entry_id, {}
+
+
+@traced("write.consolidated")
+def write_consolidated(results: Iterable[Tuple[str, Dict[str, str]]], out_prefix: str = "") -> Tuple[str, str, int, int]:
+    """Stream (entry_id, record) results to one JSONL and one long-format CSV.
+
+    Returns (jsonl_path, csv_path, exported, empty).
+    """
+    if not out_prefix:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        out_dir = os.path.dirname(os.path.abspath(__file__))
+        out_prefix = os.path.join(out_dir, f"entries_{timestamp}")
+    jsonl_path = out_prefix + ".jsonl"
+    csv_path = out_prefix + ".csv"
+    exported = 0
+    empty = 0
+    with open(jsonl_path, "w", encoding="utf-8") as jf, open(csv_path, "w", newline="", encoding="utf-8") as cf:
+        writer = csv.writer(cf)
+        writer.writerow(["entry_id", "label", "value"])
+        for entry_id, record in results:
+            if len(record) <= 1:
+                # Only the injected "Entry Id" (or nothing) came back
+                empty += 1
+                print(f"Entry {entry_id}: no fields found")
+                continue
+            jf.write(json.dumps(record, ensure_ascii=False) + "\n")
+            for label, value in record.items():
+                writer.writerow([entry_id, label, value])
+            exported += 1
+            print(f"Entry {entry_id}: {len(record)} fields")
+    return jsonl_path, csv_path, exported, empty
+
+
+@traced("write.store")
+def write_store(results: Iterable[Tuple[str, Dict[str, str]]], form_id: str = "") -> Tuple[str, int, int]:
+    """Upsert (entry_id, record) results into the SQLite entry store.
+
+    Returns (store_path, exported, empty).
+    """
+    form_id = form_id or get_form_id_from_admin_url(Config.WP_ADMIN_URL)
+    exported = 0
+    empty = 0
+    with EntryStore() as store:
+        for entry_id, record in results:
+            if len(record) <= 1:
+                empty += 1
+                print(f"Entry {entry_id}: no fields found")
+                continue
+            store.upsert(form_id, entry_id, record)
+            exported += 1
+            print(f"Entry {entry_id}: {len(record)} fields")
+        return store.path, exported, empty
+
+
+def write_results(
+    results: Iterable[Tuple[str, Dict[str, str]]],
+    out_prefix: str = "",
+    form_id: str = "",
+) -> Tuple[List[str], int, int]:
+    """Send results to the entry store when ENTRY_STORE is set, else to JSONL/CSV files.
+
+    Returns (written_paths, exported, empty).
+    """
+    if Config.ENTRY_STORE:
+        store_path, exported, empty = write_store(results, form_id)
+        return [store_path], exported, empty
+    jsonl_path, csv_path, exported, empty = write_consolidated(results, out_prefix)
+    return [jsonl_path, csv_path], exported, empty
+
+
+def journaled(results: Iterable[Tuple[str, Dict[str, str]]], journal: Optional[Journal]) -> Iterator[Tuple[str, Dict[str, str]]]:
+    """Checkpoint every entry that produced fields before passing it on."""
+    for entry_id, record in results:
+        if journal is not None and len(record) > 1:
+            journal.record(entry_id, PARSED, record=record)
+        yield entry_id, record
+
+
+def report(total: int, paths: List[str], exported: int, empty: int) -> None:
+    print(f"Exported {exported}/{total} entries ({empty} empty)")
+    for path in paths:
+        print(f"Wrote: {path}")
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Export many Gravity Forms entries in one browser session.")
+    parser.add_argument("ids", nargs="*", help="Entry ids, comma lists, ranges (a-b) or @file")
+    parser.add_argument("--file", action="append", default=[], help="File with entry ids (one per line)")
+    parser.add_argument("--mode", choices=["text", "fields"], default="text",
+                        help="text: parse visible text (default); fields: scrape label/value rows")
+    parser.add_argument("--out", default="", help="Output path prefix (default: entries_<timestamp>)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help=f"Parallel Chrome workers (capped at WORKER_COUNT={Config.WORKER_COUNT})")
+    parser.add_argument("--fetch", choices=["browser", "http"], default="browser",
+                        help="http: fetch pages with requests using the logged-in cookies, "
+                             "falling back to the browser for pages that need JS")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue the last export run from the journal (JOURNAL_FILE); entries already exported are replayed, not scraped again")
+    return parser
+
+
+def main() -> int:
+    args = build_arg_parser().parse_args()
+    specs = list(args.ids) + [f"@{path}" for path in args.file]
+    if not specs and os.getenv("ENTRY_IDS"):
+        specs = [os.getenv("ENTRY_IDS", "")]
+    try:
+        entry_ids = parse_entry_ids(specs)
+    except (OSError, ValueError) as e:
+        print(f"Invalid entry ids: {e}")
+        return 2
+    journal = None
+    if args.resume:
+        try:
+            journal = open_journal("export", resume=True)
+        except ValueError as e:
+            print(e)
+            return 2
+        if not entry_ids:
+            entry_ids = journal.args.get("ids") or []
+            args.mode = journal.args.get("mode") or args.mode
+    if not entry_ids:
+        print("Provide entry ids as args, --file, or ENTRY_IDS env.")
+        return 2
+    if journal is None:
+        journal = open_journal("export", args={"ids": entry_ids, "mode": args.mode})
+    try:
+        return run_export(args, entry_ids, journal)
+    finally:
+        if journal is not None:
+            journal.close()
+
+
+def run_export(args: argparse.Namespace, entry_ids: List[str], journal: Optional[Journal]) -> int:
+    total = len(entry_ids)
+    replayed: List[Tuple[str, Dict[str, str]]] = []
+    if journal is not None:
+        done = journal.done(PARSED)
+        replayed = [(entry_id, journal.get(PARSED, entry_id)["record"]) for entry_id in entry_ids if entry_id in done]
+        entry_ids = [entry_id for entry_id in entry_ids if entry_id not in done]
+        if replayed:
+            print(f"Resuming: {len(replayed)} entries already exported, {len(entry_ids)} to go")
+
+    if not entry_ids:
+        paths, exported, empty = write_results(replayed, args.out)
+        report(total, paths, exported, empty)
+        return 0 if exported else 1
+
+    if args.fetch == "http" or args.workers > 1:
+        # Imported here: both modules build on extract_entry from this module
+        if args.fetch == "http":
+            from http_fetch import export_entries_http
+            results = export_entries_http(entry_ids, args.workers, args.mode)
+        else:
+            from worker_pool import export_entries_parallel
+            results = export_entries_parallel(entry_ids, args.workers, args.mode)
+        paths, exported, empty = write_results(itertools.chain(replayed, journaled(results, journal)), args.out)
+        report(total, paths, exported, empty)
+        return 0 if exported else 1
+
+    browser = DriverSession()
+    try:
+        browser.start()
+        results = journaled(export_entries(browser, entry_ids, args.mode), journal)
+        paths, exported, empty = write_results(itertools.chain(replayed, results), args.out)
+        report(total, paths, exported, empty)
+        return 0 if exported else 1
+    finally:
+        browser.quit()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,331 @@
+"""
+Offline benchmarks for the pure-Python parse and map stages.
+
+- Synthetic entries are modeled on entry_visible_20250929_130110.txt: the
+  same wp-admin page text (menus, sidebar boxes, notes) and the same fields,
+  with seeded random names, products, sites and ids
+- Matching entry HTML (wp-admin chrome around #wpbody-content with th/td
+  field rows and a dt/dd sidebar) feeds parse_entry_html
+- Benchmarks: parse_text_lines, iter_text_entries, parse_entry_html,
+  map_to_so_rows, map_entry
+  at 1k/10k/100k entries; each reports best-of-N wall time, throughput and
+  tracemalloc peak memory (results kept, as a batch run would) up to
+  --memory-limit entries
+- Every run is appended to bench_results.jsonl next to this script (git commit, Python version,
+  HTML parser) and compared against the previous run of the same benchmark
+
+Corpora hold UNIQUE_ENTRIES distinct entries that are cycled up to the
+requested size, so generating 100k entries does not dominate the run.
+Nothing here touches the network or a browser.
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from export_entry_by_text import iter_text_entries, parse_text_lines
+from map_to_netsuite_so import map_to_so_rows
+from netsuite_create_so import map_entry
+from parse_saved_entry import DEFAULT_PARSER, parse_entry_html
+
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+UNIQUE_ENTRIES = 1000
+MAX_TIMED_SECONDS = 30.0  # stop repeating a benchmark once this much time is spent
+MEMORY_LIMIT = 10000
+RESULTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_results.jsonl")
+FORM_NAME = "DT IMAGE RX Checkout (No RX)"
+
+FIRST_NAMES = ["Payton", "Jordan", "Maria", "Luis", "Aisha", "Chen", "Olivia", "Noah", "Fatima", "Ethan", "Priya", "Mateo"]
+LAST_NAMES = ["Wessels", "Garcia", "Nguyen", "Smith", "Khan", "Johnson", "Lopez", "Brown", "Patel", "Kim", "Rossi", "Novak"]
+PRODUCTS = [
+    "XL Vise Z87 Clear (NO RX)",
+    "Vise Z87 Clear (NO RX)",
+    "Vise Z87 Gray (NO RX)",
+    "XL Vise Z87 Gray (NO RX)",
+    "Spire Z87 Clear (NO RX)",
+]
+SITES = [
+    "ILC 08 1414 2341 W Algonquin Rd Algonquin IL 60102-9404 847-458-2774",
+    "MKE 02 5500 S Howell Ave Milwaukee WI 53207-6120 414-555-0182",
+    "IND 11 8701 Bash St Indianapolis IN 46256-1223 317-555-0144",
+    "STL 04 1 Research Park Dr St Charles MO 63304-5685 636-555-0110",
+]
+APPROVAL = "IN PLACING THIS ORDER, I ATTEST THAT I HAVE RECEIVED APPROVAL FROM MY MANAGER TO ORDER THESE GLASSES"
+
+PAGE_HEADER = ["Screen Options", "Select a different form", FORM_NAME, "Edit", "Settings", "Entries", "Preview"]
+PAGE_FOOTER = """Entry
+Move up
+Move down
+Toggle panel: Entry
+Entry Id: {entry_id}
+
+Submitted on: {submitted}
+
+User IP: {ip}
+
+Embed Url: .../dt-non-rx-checkout/?...
+
+Move to Trash | Mark as Spam
+Print entry
+Move up
+Move down
+Toggle panel: Print entry
+Include Notes
+
+Print
+Klaviyo Feeds
+Move up
+Move down
+Toggle panel: Klaviyo Feeds
+DTC RX Buyers Edit Resubmit
+DTC Non RX Buyers Edit Resubmit
+Google Sheets
+Send to Google Sheets
+Notifications
+Move up
+Move down
+Toggle panel: Notifications
+Testing
+
+KC - Order Recieved
+
+KC - Order Processed
+
+KC - Order Shipped
+
+KC - Order Recieved ADMIN
+
+KC - Order Recieved - TEST
+
+
+
+Notes
+Move up
+Move down
+Toggle panel: Notes
+      Bulk action
+     Delete
+     Klaviyo
+added 53 minutes ago
+Error subscribing profile to list: Ue4AsU Authentication credentials were not provided. Missing or invalid private key.
+KC - Order Recieved (ID: 59a5e9217d84a)
+added 53 minutes ago
+WordPress successfully passed the notification email to the sending server.
+
+                                Also email this note to
+                                                                    {email}
+                                                                Marketing Data
+Need Marketing Insight? , Go Pro!"""
+
+ADMIN_MENU_HTML = "".join(
+    f'<li class="menu-top"><a href="admin.php?page=item{i}"><div class="wp-menu-name">Menu {i}</div></a>'
+    f'<ul class="wp-submenu">{"".join(f"<li><a href=#>Sub {i}.{j}</a></li>" for j in range(6))}</ul></li>'
+    for i in range(25)
+)
+
+
+def make_entry(entry_id: int, rng: random.Random) -> Dict[str, str]:
+    first = rng.choice(FIRST_NAMES)
+    last = rng.choice(LAST_NAMES)
+    return {
+        "Product": rng.choice(PRODUCTS),
+        "Quantity": str(rng.choice([1, 1, 1, 2, 3])),
+        "Approval Confirmation": APPROVAL,
+        "Employee ID": str(rng.randint(100000, 999999)),
+        "Site Number": rng.choice(SITES),
+        "First Name": first,
+        "Last Name": last,
+        "Birthdate": f"{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d}/{rng.randint(1960, 2006)}",
+        "Phone": f"({rng.randint(200, 989)}) {rng.randint(200, 999)}-{rng.randint(0, 9999):04d}",
+        "Employee Email": f"{first.lower()}{last.lower()}{rng.randint(1, 99)}@example.com",
+        "Signature": f"{first} {last}",
+        "Order Status": rng.choice(["Received", "Processed", "Shipped"]),
+        "Entry Id": str(entry_id),
+        "Submitted on": f"2025/{rng.randint(1, 12):02d}/{rng.randint(1, 28):02d} at {rng.randint(1, 12)}:{rng.randint(0, 59):02d} pm",
+        "form": FORM_NAME,
+    }
+
+
+def render_visible_text(entry: Dict[str, str], rng: random.Random) -> str:
+    lines = PAGE_HEADER + [f"{FORM_NAME} : Entry # {entry['Entry Id']}", "show empty fields"]
+    lines += ["Product", entry["Product"], "Quantity", entry["Quantity"], "Employee Information"]
+    for label in ("Approval Confirmation", "Employee ID", "Site Number", "First Name", "Last Name", "Birthdate"):
+        lines += [label, entry[label]]
+    lines += [
+        "Size Consent",
+        "I understand that the Vise XL size is designed for larger head sizes and have checked the measurements to ensure it will fit properly.",
+        "Vise XL size confirmation:",
+        "",
+        "6 3/8” width",
+        "2 1/8” depth (top of frame to bottom of frame)",
+        "Employee Contact Information",
+    ]
+    for label in ("Phone", "Employee Email", "Signature", "Order Status"):
+        lines += [label, entry[label]]
+    ip = ".".join(str(rng.randint(1, 254)) for _ in range(4))
+    footer = PAGE_FOOTER.format(entry_id=entry["Entry Id"], submitted=entry["Submitted on"], ip=ip, email=entry["Employee Email"])
+    return "\n".join(lines) + "\n" + footer
+
+
+def render_entry_html(entry: Dict[str, str]) -> str:
+    rows = "".join(
+        f'<tr><th class="entry-view-field-name">{label}</th><td class="entry-view-field-value"><p>{value}</p></td></tr>'
+        for label, value in entry.items()
+        if label not in ("Entry Id", "Submitted on", "form")
+    )
+    sidebar = (
+        f'<dl class="entry-meta"><dt>Entry Id</dt><dd>{entry["Entry Id"]}</dd>'
+        f'<dt>Submitted on</dt><dd>{entry["Submitted on"]}</dd></dl>'
+    )
+    return (
+        '<!DOCTYPE html><html><head><title>Entries</title>'
+        '<link rel="stylesheet" href="/wp-admin/load-styles.php"><script src="/wp-includes/js/jquery.js"></script></head>'
+        f'<body class="wp-admin"><div id="adminmenuwrap"><ul id="adminmenu">{ADMIN_MENU_HTML}</ul></div>'
+        '<div id="wpcontent"><div id="wpadminbar"><ul><li>Howdy</li></ul></div>'
+        f'<div id="wpbody"><div id="wpbody-content"><div class="wrap gforms_edit_form">'
+        f'<h2>{FORM_NAME} : Entry # {entry["Entry Id"]}</h2>'
+        f'<table class="widefat fixed entry-detail-view"><tbody>{rows}</tbody></table>'
+        f'<div id="postbox-container-1" class="postbox">{sidebar}</div>'
+        '</div></div></div></div><div id="wpfooter">Thank you for creating with WordPress.</div></body></html>'
+    )
+
+
+class Corpus:
+    def __init__(self, seed: int = 0, unique: int = UNIQUE_ENTRIES):
+        rng = random.Random(seed)
+        first_id = 30000
+        self.entries = [make_entry(first_id + i, rng) for i in range(unique)]
+        self.text_lines = [render_visible_text(e, rng).splitlines() for e in self.entries]
+        self.html = [render_entry_html(e) for e in self.entries]
+
+
+BENCHMARKS: Dict[str, tuple] = {
+    "parse_text_lines": (lambda c: c.text_lines, parse_text_lines),
+    "iter_text_entries": (lambda c: c.text_lines, lambda lines: list(iter_text_entries(lines))),
+    "parse_entry_html": (lambda c: c.html, parse_entry_html),
+    "map_to_so_rows": (lambda c: c.entries, map_to_so_rows),
+    "map_entry": (lambda c: c.entries, map_entry),
+}
+
+
+def run_benchmark(fn: Callable, inputs: List, size: int, repeat: int, memory_limit: int) -> Dict:
+    best = float("inf")
+    spent = 0.0
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        results = [fn(item) for item in itertools.islice(itertools.cycle(inputs), size)]
+        elapsed = time.perf_counter() - t0
+        del results
+        best = min(best, elapsed)
+        spent += elapsed
+        if spent > MAX_TIMED_SECONDS:
+            break
+
+    # tracemalloc slows allocation-heavy code several times over, so the
+    # memory pass is separate from timing and skipped for the largest sizes
+    peak_kib = None
+    if size <= memory_limit:
+        tracemalloc.start()
+        try:
+            # The results stay alive until the peak is read, as in a batch run
+            results = [fn(item) for item in itertools.islice(itertools.cycle(inputs), size)]
+            _, peak = tracemalloc.get_traced_memory()
+            results.clear()
+        finally:
+            tracemalloc.stop()
+        peak_kib = round(peak / 1024, 1)
+    return {"seconds": round(best, 6), "per_sec": round(size / best, 1) if best else 0.0, "peak_kib": peak_kib}
+
+
+def git_commit() -> str:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True, text=True, timeout=10,
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def load_previous(path: str) -> Dict[tuple, Dict]:
+    """Latest stored result per (benchmark, size)."""
+    previous: Dict[tuple, Dict] = {}
+    if not os.path.exists(path):
+        return previous
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            run = json.loads(line)
+            for result in run.get("results", []):
+                previous[(result["name"], result["size"])] = dict(result, commit=run.get("commit", ""))
+    return previous
+
+
+def format_change(result: Dict, before: Optional[Dict]) -> str:
+    if not before or not before.get("seconds"):
+        return ""
+    change = (result["seconds"] - before["seconds"]) / before["seconds"] * 100
+    return f"{change:+.1f}% vs {before['commit'] or 'previous'}"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the parse and map stages on synthetic entries (offline).")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in DEFAULT_SIZES), help="Comma-separated corpus sizes (default: 1000,10000,100000)")
+    parser.add_argument("--only", action="append", choices=sorted(BENCHMARKS), help="Run only this benchmark (repeatable)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed passes per benchmark; the best is kept (default: 3)")
+    parser.add_argument("--memory-limit", type=int, default=MEMORY_LIMIT,
+                        help=f"Largest size measured with tracemalloc (default: {MEMORY_LIMIT})")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus random seed (default: 0)")
+    parser.add_argument("--results", default=RESULTS_FILE, help="JSONL file results are appended to (default: bench_results.jsonl next to this script)")
+    parser.add_argument("--no-save", action="store_true", help="Print results without storing them")
+    args = parser.parse_args()
+
+    try:
+        sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+    except ValueError:
+        print(f"Invalid --sizes: {args.sizes}")
+        return 2
+    names = args.only or list(BENCHMARKS)
+
+    corpus = Corpus(args.seed)
+    previous = load_previous(args.results)
+    results = []
+    print(f"{'benchmark':<18} {'entries':>8} {'seconds':>9} {'entries/s':>11} {'peak KiB':>10}")
+    for name in names:
+        select, fn = BENCHMARKS[name]
+        inputs = select(corpus)
+        for size in sizes:
+            result = dict(name=name, size=size, **run_benchmark(fn, inputs, size, max(1, args.repeat), args.memory_limit))
+            results.append(result)
+            change = format_change(result, previous.get((name, size)))
+            peak = "-" if result["peak_kib"] is None else f"{result['peak_kib']:.0f}"
+            print(f"{name:<18} {size:>8} {result['seconds']:>9.3f} {result['per_sec']:>11.0f} {peak:>10}  {change}", flush=True)
+
+    if not args.no_save:
+        run = {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "html_parser": DEFAULT_PARSER,
+            "seed": args.seed,
+            "results": results,
+        }
+        with open(args.results, "a", encoding="utf-8") as f:
+            f.write(json.dumps(run) + "\n")
+        print(f"Appended results to: {args.results}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
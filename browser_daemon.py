@@ -0,0 +1,238 @@
+"""
+Long-lived browser daemon: keeps logged-in Chrome sessions warm for the CLIs.
+
+- One WordPress driver (headless, cached session) and one NetSuite driver
+  (visible, for 2FA), each started once and reused for every command
+- Listens on localhost HTTP; requests and replies are JSON
+    POST /export    {"entry_id": "29993", "mode": "text"|"fields"}
+                    -> {"ok", "entry_id", "text", "record"}
+    POST /snapshot  {"entry_id": "29993"} -> {"ok", "png", "txt"}
+    POST /fill-so   {"order": <map_entry output>, "auto_save": false} -> {"ok", "so_id"}
+    GET  /health    -> {"ok", "wordpress", "netsuite"}
+    POST /shutdown
+- Commands for the same site run one at a time; a crashed Chrome is
+  replaced and export/snapshot run again (fill-so is not: it may already
+  have saved the order), and a WordPress session that expired is logged in
+  again
+
+Start it with `python browser_daemon.py`, then set
+BROWSER_DAEMON_URL=http://127.0.0.1:8765 so export_entry_by_text.py,
+snapshot_entry.py and netsuite_create_so.py use it instead of starting Chrome.
+"""
+import argparse
+import hmac
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional
+
+from config import Config
+from batch_export import extract_entry
+from export_entry_by_text import read_visible_text
+from login_agent import build_driver
+from netsuite_create_so import create_order
+from netsuite_login import perform_netsuite_login
+from retry import is_driver_dead
+from session_store import is_logged_in, login_with_session
+from snapshot_entry import take_snapshot
+
+
+class WarmDriver:
+    """A Chrome driver that is started and logged in once, then lent out one command at a time."""
+
+    def __init__(self, name: str, start: Callable[[], object]):
+        self.name = name
+        self._start = start
+        self._driver = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._driver is not None
+
+    def run(self, fn: Callable, *args, replay: bool = True):
+        """Run fn(driver, *args); when Chrome died, start a new driver and (with replay) run fn once more.
+
+        Page errors (timeouts, stale elements) are raised as they are and keep
+        the driver.
+        """
+        with self._lock:
+            if self._driver is None:
+                self._driver = self._start()
+            try:
+                return fn(self._driver, *args)
+            except Exception as e:
+                if not is_driver_dead(e):
+                    raise
+                # Chrome crashed or the window was closed
+                self._quit()
+                if not replay:
+                    raise  # a new driver is started by the next command
+                self._driver = self._start()
+                return fn(self._driver, *args)
+
+    def _quit(self) -> None:
+        try:
+            self._driver.quit()
+        except Exception:
+            pass
+        self._driver = None
+
+    def close(self) -> None:
+        with self._lock:
+            if self._driver is not None:
+                self._quit()
+
+
+def start_wordpress():
+    driver = build_driver(headless=True)
+    login_with_session(driver)
+    return driver
+
+
+def start_netsuite():
+    username = os.getenv("NS_USERNAME", "")
+    password = os.getenv("NS_PASSWORD", "")
+    login_url = os.getenv("NS_LOGIN_URL", "https://system.netsuite.com/pages/customerlogin.jsp?country=US")
+    if not username or not password:
+        raise ValueError("Set NS_USERNAME and NS_PASSWORD env vars.")
+    driver = build_driver(headless=False)
+    perform_netsuite_login(driver, login_url, username, password)
+    return driver
+
+
+def export_command(driver, entry_id: str, mode: str) -> Dict:
+    record = extract_entry(driver, entry_id, mode)
+    if not is_logged_in(driver):
+        # Cookies expired since the daemon started
+        login_with_session(driver)
+        record = extract_entry(driver, entry_id, mode)
+    reply = {"ok": True, "entry_id": entry_id, "record": record}
+    if mode == "text":
+        reply["text"] = read_visible_text(driver)
+    return reply
+
+
+def snapshot_command(driver, entry_id: str) -> Dict:
+    png_path, txt_path = take_snapshot(driver, entry_id)
+    if not is_logged_in(driver):
+        login_with_session(driver)
+        png_path, txt_path = take_snapshot(driver, entry_id)
+    return {"ok": True, "png": png_path, "txt": txt_path}
+
+
+def fill_so_command(driver, order: Dict[str, str], auto_save: bool) -> Dict:
+    so_id = create_order(driver, order, auto_save)
+    return {"ok": bool(so_id), "so_id": so_id}
+
+
+class DaemonServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, token: str = ""):
+        super().__init__(address, DaemonHandler)
+        self.token = token
+        self.wordpress = WarmDriver("wordpress", start_wordpress)
+        self.netsuite = WarmDriver("netsuite", start_netsuite)
+
+    def close_drivers(self) -> None:
+        self.wordpress.close()
+        self.netsuite.close()
+
+
+class DaemonHandler(BaseHTTPRequestHandler):
+    server: DaemonServer
+
+    def _reply(self, status: int, data: Dict) -> None:
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _authorized(self) -> bool:
+        if not self.server.token:
+            return True
+        return hmac.compare_digest(self.headers.get("X-Daemon-Token", ""), self.server.token)
+
+    def _payload(self) -> Dict:
+        length = int(self.headers.get("Content-Length") or 0)
+        return json.loads(self.rfile.read(length) or b"{}") if length else {}
+
+    def do_GET(self) -> None:
+        if self.path.rstrip("/") != "/health":
+            self._reply(404, {"ok": False, "error": f"Unknown path: {self.path}"})
+            return
+        self._reply(200, {"ok": True, "wordpress": self.server.wordpress.running, "netsuite": self.server.netsuite.running})
+
+    def do_POST(self) -> None:
+        if not self._authorized():
+            self._reply(403, {"ok": False, "error": "Invalid daemon token"})
+            return
+        command = self.path.strip("/")
+        try:
+            payload = self._payload()
+            reply = self._dispatch(command, payload)
+        except KeyError as e:
+            self._reply(400, {"ok": False, "error": f"Missing field: {e.args[0]}"})
+            return
+        except ValueError as e:
+            self._reply(400, {"ok": False, "error": str(e)})
+            return
+        except Exception as e:
+            self._reply(500, {"ok": False, "error": str(e) or type(e).__name__})
+            return
+        if reply is None:
+            self._reply(404, {"ok": False, "error": f"Unknown command: {command}"})
+            return
+        self._reply(200, reply)
+
+    def _dispatch(self, command: str, payload: Dict) -> Optional[Dict]:
+        if command == "export":
+            entry_id = str(payload["entry_id"])
+            mode = payload.get("mode", "text")
+            if mode not in ("text", "fields"):
+                raise ValueError(f"Unknown mode: {mode}")
+            return self.server.wordpress.run(export_command, entry_id, mode)
+        if command == "snapshot":
+            return self.server.wordpress.run(snapshot_command, str(payload["entry_id"]))
+        if command == "fill-so":
+            # Never replayed: the first attempt may already have saved the order
+            return self.server.netsuite.run(fill_so_command, payload["order"], bool(payload.get("auto_save")), replay=False)
+        if command == "shutdown":
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+            return {"ok": True}
+        return None
+
+    def log_message(self, fmt: str, *args) -> None:
+        print(f"[daemon] {self.address_string()} {fmt % args}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Keep logged-in WordPress and NetSuite browsers warm for the CLIs.")
+    parser.add_argument("--host", default="127.0.0.1", help="Bind address (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8765, help="Port (default: 8765)")
+    parser.add_argument("--netsuite", action="store_true", help="Log in to NetSuite at start-up instead of on the first fill-so")
+    args = parser.parse_args()
+
+    server = DaemonServer((args.host, args.port), Config.BROWSER_DAEMON_TOKEN)
+    try:
+        print("Starting WordPress browser...")
+        server.wordpress.run(lambda driver: None)
+        if args.netsuite:
+            print("Starting NetSuite browser...")
+            server.netsuite.run(lambda driver: None)
+        print(f"Browser daemon listening on http://{args.host}:{args.port}")
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.close_drivers()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -15,22 +15,87 @@ class Config:
     WP_USERNAME = os.getenv('WP_USERNAME')
     WP_PASSWORD = os.getenv('WP_PASSWORD')
     
+    # Gravity Forms REST API (v2) credentials; base URL defaults to <site>/wp-json/gf/v2
+    GF_API_BASE_URL = os.getenv('GF_API_BASE_URL', '')
+    GF_API_KEY = os.getenv('GF_API_KEY')
+    GF_API_SECRET = os.getenv('GF_API_SECRET')
+    GF_EXPORT_TIMEOUT = int(os.getenv('GF_EXPORT_TIMEOUT', '600'))  # seconds to wait for a native CSV export download
+    WP_TIMEZONE = os.getenv('WP_TIMEZONE', '')  # site time zone (Settings -> General), e.g. America/Chicago; unset = this machine's
+    
     # Browser settings
     HEADLESS_MODE = os.getenv('HEADLESS_MODE', 'False').lower() == 'true'
     IMPLICIT_WAIT = int(os.getenv('IMPLICIT_WAIT', '10'))
     PAGE_LOAD_TIMEOUT = int(os.getenv('PAGE_LOAD_TIMEOUT', '30'))
     
+    # Lean page loading (Chrome DevTools request blocking)
+    LEAN_LOADING = os.getenv('LEAN_LOADING', 'False').lower() == 'true'
+    LEAN_WINDOW_SIZE = os.getenv('LEAN_WINDOW_SIZE', '1024,768')  # headless only
+    BLOCK_RESOURCE_TYPES = os.getenv('BLOCK_RESOURCE_TYPES', 'image,font,media')  # 'stylesheet' can change visible text
+    BLOCK_URL_PATTERNS = os.getenv(
+        'BLOCK_URL_PATTERNS',
+        '*google-analytics.com*,*googletagmanager.com*,*doubleclick.net*,*facebook.net*,'
+        '*hotjar.com*,*fonts.googleapis.com*,*fonts.gstatic.com*,*gravatar.com*',
+    )
+    
     # Data extraction settings
     MAX_ENTRIES = int(os.getenv('MAX_ENTRIES', '1000'))
     ENTRIES_PER_PAGE = int(os.getenv('ENTRIES_PER_PAGE', '20'))
+    WORKER_COUNT = int(os.getenv('WORKER_COUNT', '4'))  # cap on parallel Chrome workers
+    PIPELINE_QUEUE_SIZE = int(os.getenv('PIPELINE_QUEUE_SIZE', '16'))  # bound of each pipeline stage queue
+    WATERMARK_FILE = os.getenv('WATERMARK_FILE', '.sync_watermark.json')  # incremental sync state
     
     # Output settings
     OUTPUT_FORMAT = os.getenv('OUTPUT_FORMAT', 'csv')  # csv, json, excel
     OUTPUT_FILE = os.getenv('OUTPUT_FILE', 'wordpress_entries.csv')
+    NS_CSV_MAX_ROWS = int(os.getenv('NS_CSV_MAX_ROWS', '25000'))  # NetSuite CSV Import per-file row limit
+    ENTRY_STORE = os.getenv('ENTRY_STORE', '')  # SQLite path; when set, exports go there instead of files
+    DEDUP_INDEX = os.getenv('DEDUP_INDEX', '.dedup_index.db')  # entries already ordered; empty = off
+    JOURNAL_FILE = os.getenv('JOURNAL_FILE', '.run_journal.jsonl')  # per-entry checkpoints for --resume; empty = off
     
     # Retry settings
-    MAX_RETRIES = int(os.getenv('MAX_RETRIES', '3'))
-    RETRY_DELAY = int(os.getenv('RETRY_DELAY', '2'))
+    MAX_RETRIES = int(os.getenv('MAX_RETRIES', '3'))  # extra attempts per entry after the first
+    RETRY_DELAY = int(os.getenv('RETRY_DELAY', '2'))  # seconds before the first retry; doubles per retry
+    RETRY_MAX_DELAY = int(os.getenv('RETRY_MAX_DELAY', '60'))
+    
+    # Session cache settings (reuse WordPress cookies between runs)
+    SESSION_CACHE = os.getenv('SESSION_CACHE', 'True').lower() == 'true'
+    SESSION_FILE = os.getenv('SESSION_FILE', '.wp_session.json')
+    SESSION_MAX_AGE = int(os.getenv('SESSION_MAX_AGE', '172800'))  # WordPress default auth lifetime (2 days)
+    
+    # Per-phase timing spans (tracing.py); near-zero cost when disabled
+    TRACE_ENABLED = os.getenv('TRACE_ENABLED', 'False').lower() == 'true'
+    TRACE_FILE = os.getenv('TRACE_FILE', 'trace_spans.jsonl')  # JSON lines, appended
+    TRACE_PROM_DIR = os.getenv('TRACE_PROM_DIR', '')  # node_exporter textfile directory; unset = no .prom file
+    
+    # Browser daemon (browser_daemon.py): warm, logged-in Chrome shared by the CLIs
+    BROWSER_DAEMON_URL = os.getenv('BROWSER_DAEMON_URL', '')  # e.g. http://127.0.0.1:8765; unset = start Chrome per run
+    BROWSER_DAEMON_TOKEN = os.getenv('BROWSER_DAEMON_TOKEN', '')
+    
+    # NetSuite REST record API (token-based auth, or an OAuth 2.0 bearer token)
+    NS_ACCOUNT_ID = os.getenv('NS_ACCOUNT_ID', '')
+    NS_REST_BASE_URL = os.getenv('NS_REST_BASE_URL', '')  # default: https://<account>.suitetalk.api.netsuite.com
+    NS_CONSUMER_KEY = os.getenv('NS_CONSUMER_KEY')
+    NS_CONSUMER_SECRET = os.getenv('NS_CONSUMER_SECRET')
+    NS_TOKEN_ID = os.getenv('NS_TOKEN_ID')
+    NS_TOKEN_SECRET = os.getenv('NS_TOKEN_SECRET')
+    NS_ACCESS_TOKEN = os.getenv('NS_ACCESS_TOKEN')
+    NS_SUBMIT_WORKERS = int(os.getenv('NS_SUBMIT_WORKERS', '4'))
+    NS_BATCH_SIZE = int(os.getenv('NS_BATCH_SIZE', '50'))
+    NS_SAVE_TIMEOUT = int(os.getenv('NS_SAVE_TIMEOUT', '300'))  # seconds to wait for a manual Save per order
+    
+    # Customer resolution (email/name -> NetSuite internal id)
+    NS_CUSTOMER_CACHE_FILE = os.getenv('NS_CUSTOMER_CACHE_FILE', '.ns_customers.json')
+    NS_CUSTOMER_CACHE_SIZE = int(os.getenv('NS_CUSTOMER_CACHE_SIZE', '10000'))
+    NS_CUSTOMER_TTL = int(os.getenv('NS_CUSTOMER_TTL', '2592000'))  # 30 days
+    NS_CREATE_CUSTOMERS = os.getenv('NS_CREATE_CUSTOMERS', 'True').lower() == 'true'
+    NS_CUSTOMER_SUBSIDIARY = os.getenv('NS_CUSTOMER_SUBSIDIARY', '')  # required for new customers in OneWorld accounts
+    
+    # Item catalog (product name -> NetSuite item internal id)
+    NS_ITEM_CATALOG = os.getenv('NS_ITEM_CATALOG', '')  # NetSuite item export CSV; unset = items by name (UI/CSV only, REST needs ids)
+    NS_ITEM_MATCH_MIN = float(os.getenv('NS_ITEM_MATCH_MIN', '0.7'))  # token overlap needed for a fuzzy match
+    
+    # Order consolidation: one multi-line Sales Order per customer and site
+    NS_CONSOLIDATE_HOURS = float(os.getenv('NS_CONSOLIDATE_HOURS', '0'))  # window from a group's first entry; 0 = off
     
     @classmethod
     def validate(cls):
@@ -0,0 +1,169 @@
+"""
+Merge orders for the same customer and site into multi-line Sales Orders.
+
+- Entries are grouped by customer (email or name, case-insensitive) and
+  Site Number; a group holds the entries submitted within
+  NS_CONSOLIDATE_HOURS of its first entry ("Submitted on")
+- Entries without a known customer or a readable submit time stay on their own
+  (with a warning for the ones missing the time)
+- The submit time is captured by every extractor: text mode, --mode fields
+  and --fetch http read the "Submitted on" line of the entry sidebar, the
+  REST API and the native export have it as a column
+- A merged order has one item line per entry, its memo lists every source
+  Entry ID, and its external id is derived from the entry ids, so NetSuite
+  rejects a replay of the same group
+- netsuite_rest.py and netsuite_create_so.py merge map_entry orders;
+  map_to_netsuite_so.py gives the CSV rows of a group one External ID, which
+  CSV Import turns into one transaction
+
+NS_CONSOLIDATE_HOURS=0 (default) keeps one order per entry; the streaming
+pipeline always does.
+"""
+import hashlib
+import sys
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple, TypeVar
+
+from config import Config
+from entry_time import parse_submitted
+
+
+T = TypeVar("T")
+
+
+def warn_untimed(count: int) -> None:
+    if count:
+        print(f"{count} entries have no readable \"Submitted on\" time and were not consolidated", file=sys.stderr)
+
+
+def group_key(entity: str, site_number: str) -> Optional[Tuple[str, str]]:
+    entity = " ".join(str(entity or "").split()).casefold()
+    if not entity or entity == "unknown customer":
+        return None
+    return entity, " ".join(str(site_number or "").split()).casefold()
+
+
+def group_within_window(
+    items: Iterable[T],
+    key: Callable[[T], Optional[Hashable]],
+    submitted: Callable[[T], Optional[datetime]],
+    hours: float,
+) -> List[List[T]]:
+    """Split items into groups of equal key submitted within `hours` of the group's first item.
+
+    Groups come out in the order of their first item; items without a key
+    or a time are groups of their own.
+    """
+    window = timedelta(hours=hours)
+    by_key: Dict[Hashable, List[Tuple[datetime, int, T]]] = {}
+    positions: List[Tuple[int, List[T]]] = []
+    for position, item in enumerate(items):
+        k = key(item)
+        at = submitted(item) if k is not None else None
+        if k is None or at is None:
+            positions.append((position, [item]))
+            continue
+        by_key.setdefault(k, []).append((at, position, item))
+    for timed in by_key.values():
+        timed.sort(key=lambda t: (t[0], t[1]))
+        start: Optional[datetime] = None
+        for at, position, item in timed:
+            if start is None or at - start > window:
+                start = at
+                positions.append((position, []))
+            positions[-1][1].append(item)
+    return [group for _, group in sorted(positions, key=lambda p: p[0])]
+
+
+def external_id(form_id: str, entry_ids: List[str]) -> str:
+    """gf-<form>-<entry> for one entry; the first entry plus a digest of all ids for a group."""
+    if len(entry_ids) == 1:
+        return f"gf-{form_id}-{entry_ids[0]}"
+    digest = hashlib.sha1(",".join(entry_ids).encode("utf-8")).hexdigest()[:10]
+    return f"gf-{form_id}-{entry_ids[0]}-{digest}"
+
+
+def merge_memo(memo: str, entry_ids: List[str]) -> str:
+    """Replace the "Entry: <id>" part of a memo with "Entries: <id>, <id>, ..."."""
+    entries = "Entries: " + ", ".join(entry_ids)
+    parts = [entries if p.startswith("Entry: ") else p for p in memo.split(" | ")] if memo else []
+    if entries not in parts:
+        parts.insert(1 if parts and parts[0].startswith("Form: ") else 0, entries)
+    return " | ".join(parts)
+
+
+def order_lines(mapped: Dict) -> List[Dict[str, str]]:
+    """Item lines of a map_entry order: its own line, or every line of a merged order."""
+    if mapped.get("lines"):
+        return mapped["lines"]
+    return [{
+        "item": mapped["item"],
+        "item_id": mapped.get("item_id", ""),
+        "item_name": mapped.get("item_name", ""),
+        "quantity": mapped["quantity"],
+        "entry_id": mapped.get("entry_id", ""),
+    }]
+
+
+def order_entry_ids(mapped: Dict) -> List[str]:
+    """Source entry ids of a map_entry order, merged or not."""
+    if mapped.get("entry_ids"):
+        return mapped["entry_ids"]
+    return [mapped["entry_id"]] if mapped.get("entry_id") else []
+
+
+def merge_orders(group: List[Dict], form_id: str) -> Dict:
+    if len(group) == 1:
+        return group[0]
+    entry_ids = [m["entry_id"] for m in group]
+    merged = dict(group[0])
+    merged["lines"] = [line for m in group for line in order_lines(m)]
+    merged["entry_ids"] = entry_ids
+    merged["memo"] = merge_memo(group[0].get("memo", ""), entry_ids)
+    merged["external_id"] = external_id(form_id, entry_ids)
+    return merged
+
+
+def consolidate_orders(orders: Iterable[Dict], form_id: str, hours: Optional[float] = None) -> List[Dict]:
+    """Merge map_entry orders per customer and site; single orders pass through unchanged."""
+    hours = Config.NS_CONSOLIDATE_HOURS if hours is None else hours
+    orders = list(orders)
+    if hours <= 0:
+        return orders
+    warn_untimed(sum(1 for m in orders if m.get("entry_id") and parse_submitted(m.get("submitted_on", "")) is None))
+    groups = group_within_window(
+        orders,
+        lambda m: group_key(m["entity"], m.get("site_number", "")) if m.get("entry_id") else None,
+        lambda m: parse_submitted(m.get("submitted_on", "")),
+        hours,
+    )
+    return [merge_orders(group, form_id) for group in groups]
+
+
+def consolidate_rows(mapped: Iterable[Tuple[Dict, List[Dict]]], form_id: str, hours: Optional[float] = None) -> List[Tuple[Dict, List[Dict]]]:
+    """Give the CSV rows of each group of (entry, map_to_so_rows rows) pairs one External ID and memo.
+
+    Pairs come back grouped (a group's rows are adjacent) with updated rows.
+    """
+    hours = Config.NS_CONSOLIDATE_HOURS if hours is None else hours
+    mapped = list(mapped)
+    if hours <= 0:
+        groups = [[pair] for pair in mapped]
+    else:
+        warn_untimed(sum(1 for entry, _ in mapped if entry.get("Entry Id") and parse_submitted(entry.get("Submitted on", "")) is None))
+        groups = group_within_window(
+            mapped,
+            lambda pair: group_key(pair[1][0]["Entity"], pair[0].get("Site Number", "")) if pair[1] and pair[0].get("Entry Id") else None,
+            lambda pair: parse_submitted(pair[0].get("Submitted on", "")),
+            hours,
+        )
+    result: List[Tuple[Dict, List[Dict]]] = []
+    for group in groups:
+        entry_ids = [str(entry.get("Entry Id") or "") for entry, _ in group]
+        ext_id = external_id(form_id, entry_ids) if all(entry_ids) else ""
+        update: Dict[str, str] = {"External ID": ext_id}
+        if len(group) > 1 and group[0][1]:
+            update["Memo"] = merge_memo(group[0][1][0]["Memo"], entry_ids)
+        for entry, rows in group:
+            result.append((entry, [dict(row, **update) for row in rows]))
+    return result
@@ -0,0 +1,217 @@
+"""
+Resolve Sales Order customers (email or name) to NetSuite internal ids.
+
+- CustomerCache: bounded LRU (NS_CUSTOMER_CACHE_SIZE entries) whose entries
+  expire after NS_CUSTOMER_TTL seconds; persisted to NS_CUSTOMER_CACHE_FILE
+  so repeat customers never need another lookup
+- CustomerResolver: fills the cache in bulk with SuiteQL (one query per
+  SUITEQL_CHUNK emails/names of a batch), creates customers that do not
+  exist yet when NS_CREATE_CUSTOMERS is on, and rewrites mapped["entity"]
+  to the internal id
+- Without API credentials the resolver only answers from the cache
+
+build_sales_order_body sends numeric entities as {"id": ...}, and the
+browser form fill opens the Sales Order with ?entity=<id> instead of typing
+into the customer autocomplete.
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import requests
+
+from config import Config
+from netsuite_rest import NetSuiteClient
+
+
+SUITEQL_PATH = "/services/rest/query/v1/suiteql"
+CUSTOMER_PATH = "/services/rest/record/v1/customer"
+SUITEQL_CHUNK = 100
+
+
+def customer_key(value: str) -> str:
+    """Cache key: emails lower-cased, names case-folded with single spaces."""
+    value = " ".join(str(value).split())
+    return value.lower() if "@" in value else value.casefold()
+
+
+def cache_path() -> str:
+    path = Config.NS_CUSTOMER_CACHE_FILE
+    if not path or os.path.isabs(path):
+        return path
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), path)
+
+
+class CustomerCache:
+    """LRU of customer key -> (internal id, expires at), thread-safe."""
+
+    def __init__(self, max_size: int = 0, ttl: int = 0, path: Optional[str] = None):
+        self.max_size = max_size or Config.NS_CUSTOMER_CACHE_SIZE
+        self.ttl = ttl or Config.NS_CUSTOMER_TTL
+        self.path = cache_path() if path is None else path
+        self._items: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.load()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, value: str) -> str:
+        key = customer_key(value)
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return ""
+            if item[1] < time.time():
+                del self._items[key]
+                self._dirty = True
+                return ""
+            self._items.move_to_end(key)
+            return item[0]
+
+    def put(self, value: str, internal_id: str) -> None:
+        key = customer_key(value)
+        with self._lock:
+            self._items[key] = (str(internal_id), time.time() + self.ttl)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+            self._dirty = True
+
+    def load(self) -> None:
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        # Stored oldest first, so insertion order restores the LRU order
+        for key, internal_id, expires_at in data.get("customers", []):
+            if expires_at > now:
+                self._items[key] = (internal_id, expires_at)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+    def save(self) -> Optional[str]:
+        if not self.path or not self._dirty:
+            return None
+        with self._lock:
+            data = {"customers": [[k, v[0], v[1]] for k, v in self._items.items()]}
+            self._dirty = False
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+        return self.path
+
+
+def _sql_string(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _split_name(name: str) -> Tuple[str, str]:
+    parts = name.split()
+    if len(parts) < 2:
+        return name, ""
+    return " ".join(parts[:-1]), parts[-1]
+
+
+class CustomerResolver:
+    def __init__(self, client: Optional[NetSuiteClient], cache: Optional[CustomerCache] = None, create_missing: Optional[bool] = None):
+        self.client = client
+        self.cache = cache if cache is not None else CustomerCache()
+        self.create_missing = Config.NS_CREATE_CUSTOMERS if create_missing is None else create_missing
+        self._lock = threading.Lock()
+        self._not_found: set = set()  # keys a prefetch looked up without a match
+
+    def _suiteql(self, query: str) -> List[Dict]:
+        resp = self.client.request("POST", SUITEQL_PATH, {"q": query}, headers={"Prefer": "transient"})
+        resp.raise_for_status()
+        return resp.json().get("items") or []
+
+    def _lookup(self, values: List[str]) -> None:
+        emails = sorted({customer_key(v) for v in values if "@" in v})
+        names = sorted({customer_key(v) for v in values if "@" not in v})
+        for column, keys in (("email", emails), ("entityid", names)):
+            for i in range(0, len(keys), SUITEQL_CHUNK):
+                chunk = keys[i:i + SUITEQL_CHUNK]
+                query = (
+                    f"SELECT id, {column} AS matched FROM customer "
+                    f"WHERE LOWER({column}) IN ({', '.join(_sql_string(k) for k in chunk)}) AND isinactive = 'F' "
+                    "ORDER BY id"
+                )
+                for row in self._suiteql(query):
+                    matched = str(row.get("matched") or "")
+                    # First (oldest) match wins when an email is shared
+                    if matched and not self.cache.get(matched):
+                        self.cache.put(matched, str(row["id"]))
+
+    def _create(self, mapped: Dict[str, str]) -> str:
+        email = mapped.get("email") or (mapped["entity"] if "@" in mapped["entity"] else "")
+        first_name = mapped.get("first_name") or ""
+        last_name = mapped.get("last_name") or ""
+        if not first_name and not last_name:
+            first_name, last_name = _split_name(mapped["entity"] if "@" not in mapped["entity"] else email.split("@")[0])
+        body: Dict = {"isPerson": True, "firstName": first_name or "-", "lastName": last_name or "-"}
+        if email:
+            body["email"] = email
+        if Config.NS_CUSTOMER_SUBSIDIARY:
+            body["subsidiary"] = {"id": Config.NS_CUSTOMER_SUBSIDIARY}
+        resp = self.client.request("POST", CUSTOMER_PATH, body)
+        if resp.status_code not in (200, 201, 204):
+            return ""
+        location = resp.headers.get("Location", "")
+        return location.rstrip("/").rsplit("/", 1)[-1] if location else ""
+
+    def prefetch(self, orders: Iterable[Dict[str, str]]) -> None:
+        """Look up every uncached customer of a batch in as few queries as possible."""
+        if self.client is None:
+            return
+        missing = [o["entity"] for o in orders if o.get("entity") and not o["entity"].isdigit() and not self.cache.get(o["entity"])]
+        if missing:
+            try:
+                self._lookup(missing)
+            except (requests.RequestException, ValueError, KeyError) as e:
+                print(f"Customer lookup failed: {e}")
+                return
+            self._not_found.update(customer_key(v) for v in missing if not self.cache.get(v))
+
+    def resolve(self, mapped: Dict[str, str]) -> str:
+        """Internal id for mapped["entity"] ("" when unknown and not created)."""
+        entity = mapped.get("entity") or ""
+        if not entity or entity.isdigit():
+            return entity
+        internal_id = self.cache.get(entity)
+        if internal_id or self.client is None:
+            return internal_id
+        # Serialize misses so two orders for a new customer create it once
+        with self._lock:
+            internal_id = self.cache.get(entity)
+            if internal_id:
+                return internal_id
+            try:
+                if customer_key(entity) not in self._not_found:
+                    self._lookup([entity])
+                internal_id = self.cache.get(entity)
+                if not internal_id and self.create_missing:
+                    internal_id = self._create(mapped)
+                    if internal_id:
+                        print(f"Created customer {entity}: {internal_id}")
+                        self.cache.put(entity, internal_id)
+            except (requests.RequestException, ValueError, KeyError) as e:
+                print(f"Customer lookup failed for {entity}: {e}")
+        return internal_id
+
+    def apply(self, mapped: Dict[str, str]) -> Dict[str, str]:
+        """Copy of mapped with entity replaced by its internal id when known."""
+        internal_id = self.resolve(mapped)
+        return dict(mapped, entity=internal_id) if internal_id else mapped
+
+    def close(self) -> None:
+        self.cache.save()
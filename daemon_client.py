@@ -0,0 +1,39 @@
+"""
+Thin client for browser_daemon.py.
+
+The CLIs call `daemon_request` first when BROWSER_DAEMON_URL is set; it returns None
+when the daemon is not reachable so they can fall back to starting Chrome
+themselves. A daemon that took the request but did not answer in time is not
+"unreachable": the reply is an error with "no_reply" set, since the command
+may still be running there.
+"""
+from typing import Dict, Optional
+
+import requests
+from urllib3.exceptions import ConnectTimeoutError
+
+from config import Config
+
+
+def daemon_request(command: str, payload: Optional[Dict] = None, timeout: int = 0) -> Optional[Dict]:
+    if not Config.BROWSER_DAEMON_URL:
+        return None
+    url = f"{Config.BROWSER_DAEMON_URL.rstrip('/')}/{command}"
+    headers = {"X-Daemon-Token": Config.BROWSER_DAEMON_TOKEN} if Config.BROWSER_DAEMON_TOKEN else {}
+    try:
+        resp = requests.post(url, json=payload or {}, headers=headers,
+                             timeout=timeout or max(Config.PAGE_LOAD_TIMEOUT, 60) * 2)
+    except requests.ConnectionError as e:
+        reason = getattr(e.args[0], "reason", None) if e.args else None
+        if isinstance(reason, ConnectTimeoutError):
+            return None  # refused or no answer to connect: the request never arrived
+        return {"ok": False, "no_reply": True, "error": f"Browser daemon dropped the connection: {e}"}
+    except requests.RequestException as e:
+        return {"ok": False, "no_reply": True, "error": f"No reply from browser daemon: {e}"}
+    try:
+        data = resp.json()
+    except ValueError:
+        data = {"ok": False, "error": resp.text[:500]}
+    if resp.status_code != 200 and "error" not in data:
+        data["error"] = f"HTTP {resp.status_code}"
+    return data
@@ -0,0 +1,118 @@
+"""
+Persistent index of entries already turned into Sales Orders.
+
+- One row per (form_id, entry_id): content hash of the fields that decide
+  the order and the NetSuite order created for them (internal id, or
+  "csv:<file>" for rows written to an import CSV)
+- check() tells the pipeline and the submit scripts whether an entry is new,
+  unchanged since its order (skip) or changed after its order (needs --force,
+  so a replay never creates a second order silently)
+- Only the fields map_entry builds the order from (product, quantity,
+  customer, employee id, site) are hashed; notes, workflow fields and page
+  chrome are not, so a status change does not make an entry CHANGED and
+  every extractor hashes the same entry alike
+
+Stored in DEDUP_INDEX (SQLite, default .dedup_index.db next to the
+scripts); set DEDUP_INDEX to an empty value to turn it off.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Dict, Optional, Tuple
+
+from config import Config
+
+
+# Fields map_entry reads, with the aliases it accepts
+ORDER_FIELDS = (
+    ("Product", "product"),
+    ("Quantity", "quantity"),
+    ("Employee Email", "email"),
+    ("First Name",),
+    ("Last Name",),
+    ("Employee ID",),
+    ("Site Number",),
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    form_id      TEXT NOT NULL,
+    entry_id     INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    order_id     TEXT NOT NULL,
+    updated_at   TEXT NOT NULL,
+    PRIMARY KEY (form_id, entry_id)
+);
+"""
+
+NEW = "new"
+UNCHANGED = "unchanged"
+CHANGED = "changed"
+
+
+def content_hash(record: Dict[str, str]) -> str:
+    values = []
+    for aliases in ORDER_FIELDS:
+        value = next((record[a] for a in aliases if record.get(a)), "")
+        values.append(" ".join(str(value).split()))
+    return hashlib.sha256(json.dumps(values, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+def index_path() -> str:
+    path = Config.DEDUP_INDEX
+    if not path or os.path.isabs(path):
+        return path
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), path)
+
+
+class DedupIndex:
+    def __init__(self, path: str = ""):
+        self.path = path or index_path()
+        if not self.path:
+            raise ValueError("DEDUP_INDEX is not set")
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self) -> "DedupIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def lookup(self, form_id: str, entry_id: str) -> Optional[Tuple[str, str]]:
+        """(content_hash, order_id) recorded for the entry, or None."""
+        return self.conn.execute(
+            "SELECT content_hash, order_id FROM orders WHERE form_id = ? AND entry_id = ?",
+            (str(form_id), int(entry_id)),
+        ).fetchone()
+
+    def check(self, form_id: str, entry_id: str, digest: str) -> Tuple[str, str]:
+        """Return (NEW | UNCHANGED | CHANGED, existing order id)."""
+        if not str(entry_id).isdigit():
+            return NEW, ""
+        row = self.lookup(form_id, entry_id)
+        if row is None:
+            return NEW, ""
+        return (UNCHANGED if row[0] == digest else CHANGED), row[1]
+
+    def record_order(self, form_id: str, entry_id: str, digest: str, order_id: str) -> None:
+        if not str(entry_id).isdigit():
+            return
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO orders (form_id, entry_id, content_hash, order_id, updated_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (form_id, entry_id) DO UPDATE SET content_hash = excluded.content_hash, "
+                "order_id = excluded.order_id, updated_at = excluded.updated_at",
+                (str(form_id), int(entry_id), digest, order_id or "saved", time.strftime("%Y-%m-%d %H:%M:%S")),
+            )
+
+
+def open_index() -> Optional[DedupIndex]:
+    """The configured index, or None when DEDUP_INDEX is empty."""
+    return DedupIndex() if index_path() else None
@@ -0,0 +1,187 @@
+"""
+SQLite-backed store for exported entries and their mapped Sales Order rows.
+
+- entries: one row per (form_id, entry_id) holding the label/value record as
+  JSON, plus indexed status, email and date_created columns
+- so_rows: mapped NetSuite rows per entry (output of map_to_netsuite_so)
+
+Status moves exported -> mapped -> submitted as the stages run. Enable it
+for the export scripts by setting ENTRY_STORE to a database path.
+"""
+import json
+import sqlite3
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from config import Config
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    form_id      TEXT NOT NULL,
+    entry_id     INTEGER NOT NULL,
+    status       TEXT NOT NULL DEFAULT 'exported',
+    email        TEXT NOT NULL DEFAULT '',
+    date_created TEXT NOT NULL DEFAULT '',
+    data         TEXT NOT NULL,
+    updated_at   TEXT NOT NULL,
+    PRIMARY KEY (form_id, entry_id)
+);
+CREATE INDEX IF NOT EXISTS idx_entries_status ON entries (status);
+CREATE INDEX IF NOT EXISTS idx_entries_email ON entries (email);
+CREATE INDEX IF NOT EXISTS idx_entries_date ON entries (date_created);
+
+CREATE TABLE IF NOT EXISTS so_rows (
+    form_id  TEXT NOT NULL,
+    entry_id INTEGER NOT NULL,
+    line     INTEGER NOT NULL,
+    data     TEXT NOT NULL,
+    PRIMARY KEY (form_id, entry_id, line)
+);
+"""
+
+UPSERT_ENTRY = """
+INSERT INTO entries (form_id, entry_id, status, email, date_created, data, updated_at)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (form_id, entry_id) DO UPDATE SET
+    -- re-exporting an unchanged entry must not reset how far it has progressed
+    status = CASE WHEN entries.data = excluded.data THEN entries.status ELSE excluded.status END,
+    email = excluded.email,
+    date_created = excluded.date_created,
+    data = excluded.data,
+    updated_at = excluded.updated_at
+"""
+
+
+def _now() -> str:
+    return time.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _entry_row(form_id: str, entry_id: str, record: Dict[str, str], status: str) -> Tuple:
+    email = record.get("Employee Email") or record.get("email") or ""
+    date_created = record.get("Submitted on") or record.get("date_created") or ""
+    return (str(form_id), int(entry_id), status, email, date_created, json.dumps(record, ensure_ascii=False), _now())
+
+
+class EntryStore:
+    def __init__(self, path: str = ""):
+        self.path = path or Config.ENTRY_STORE
+        if not self.path:
+            raise ValueError("ENTRY_STORE is not set")
+        self.conn = sqlite3.connect(self.path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self) -> "EntryStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def upsert(self, form_id: str, entry_id: str, record: Dict[str, str], status: str = "exported") -> None:
+        with self.conn:
+            self.conn.execute(UPSERT_ENTRY, _entry_row(form_id, entry_id, record, status))
+
+    def upsert_many(self, form_id: str, items: Iterable[Tuple[str, Dict[str, str]]], status: str = "exported") -> int:
+        rows = [_entry_row(form_id, entry_id, record, status) for entry_id, record in items]
+        with self.conn:
+            self.conn.executemany(UPSERT_ENTRY, rows)
+        return len(rows)
+
+    def get(self, form_id: str, entry_id: str) -> Optional[Dict[str, str]]:
+        row = self.conn.execute(
+            "SELECT data FROM entries WHERE form_id = ? AND entry_id = ?", (str(form_id), int(entry_id))
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def iter_entries(
+        self,
+        form_id: Optional[str] = None,
+        status: Optional[str] = None,
+        email: Optional[str] = None,
+        since: Optional[str] = None,
+        entry_ids: Optional[Iterable[str]] = None,
+    ) -> Iterator[Tuple[str, Dict[str, str]]]:
+        """Yield (entry_id, record) in entry id order, filtered on the indexed columns."""
+        clauses: List[str] = []
+        params: List = []
+        if form_id is not None:
+            clauses.append("form_id = ?")
+            params.append(str(form_id))
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status)
+        if email is not None:
+            clauses.append("email = ?")
+            params.append(email)
+        if since is not None:
+            clauses.append("date_created >= ?")
+            params.append(since)
+        if entry_ids is not None:
+            ids = [int(i) for i in entry_ids]
+            clauses.append(f"entry_id IN ({','.join('?' * len(ids))})")
+            params.extend(ids)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        cursor = self.conn.execute(f"SELECT entry_id, data FROM entries {where} ORDER BY entry_id", params)
+        for entry_id, data in cursor:
+            yield str(entry_id), json.loads(data)
+
+    def iter_entries_with_form(self, status: Optional[str] = None) -> Iterator[Tuple[str, str, Dict[str, str]]]:
+        """Yield (form_id, entry_id, record) across all forms."""
+        if status is None:
+            cursor = self.conn.execute("SELECT form_id, entry_id, data FROM entries ORDER BY form_id, entry_id")
+        else:
+            cursor = self.conn.execute(
+                "SELECT form_id, entry_id, data FROM entries WHERE status = ? ORDER BY form_id, entry_id", (status,)
+            )
+        for form_id, entry_id, data in cursor.fetchall():
+            yield form_id, str(entry_id), json.loads(data)
+
+    def set_status(self, form_id: str, entry_ids: Iterable[str], status: str) -> None:
+        now = _now()
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE entries SET status = ?, updated_at = ? WHERE form_id = ? AND entry_id = ?",
+                [(status, now, str(form_id), int(i)) for i in entry_ids],
+            )
+
+    def save_so_rows(self, form_id: str, entry_id: str, rows: List[Dict[str, str]]) -> None:
+        with self.conn:
+            self.conn.execute("DELETE FROM so_rows WHERE form_id = ? AND entry_id = ?", (str(form_id), int(entry_id)))
+            self.conn.executemany(
+                "INSERT INTO so_rows (form_id, entry_id, line, data) VALUES (?, ?, ?, ?)",
+                [(str(form_id), int(entry_id), i, json.dumps(row, ensure_ascii=False)) for i, row in enumerate(rows)],
+            )
+
+    def iter_so_rows(self, form_id: Optional[str] = None, status: Optional[str] = None) -> Iterator[Tuple[str, Dict[str, str]]]:
+        """Yield (entry_id, row) for mapped rows, optionally filtered on the entry status."""
+        clauses: List[str] = []
+        params: List = []
+        if form_id is not None:
+            clauses.append("r.form_id = ?")
+            params.append(str(form_id))
+        if status is not None:
+            clauses.append("e.status = ?")
+            params.append(status)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        cursor = self.conn.execute(
+            "SELECT r.entry_id, r.data FROM so_rows r "
+            "JOIN entries e ON e.form_id = r.form_id AND e.entry_id = r.entry_id "
+            f"{where} ORDER BY r.entry_id, r.line",
+            params,
+        )
+        for entry_id, data in cursor:
+            yield str(entry_id), json.loads(data)
+
+    def count_by_status(self, form_id: Optional[str] = None) -> Dict[str, int]:
+        if form_id is None:
+            cursor = self.conn.execute("SELECT status, COUNT(*) FROM entries GROUP BY status")
+        else:
+            cursor = self.conn.execute(
+                "SELECT status, COUNT(*) FROM entries WHERE form_id = ? GROUP BY status", (str(form_id),)
+            )
+        return {status: count for status, count in cursor}
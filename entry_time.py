@@ -0,0 +1,58 @@
+"""
+Read an entry's "Submitted on" time, whichever extractor produced the record.
+
+- The entry page sidebar shows "Submitted on: 2025/09/29 at 12:08 pm";
+  find_submitted_on pulls it out of the page text (export_first_entry and
+  parse_saved_entry, which have no sidebar rows of their own)
+- parse_submitted reads every format the extractors write: the entry page,
+  the native CSV export and the REST API
+- The entry page and the native export show site time, the REST API's
+  date_created is UTC; utc_to_site converts it to site time (WP_TIMEZONE,
+  else this machine's zone) so consolidation windows compare like with like
+"""
+import re
+from datetime import datetime, timezone
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from config import Config
+
+
+# "Submitted on" as the entry page, the native export and the REST API write it
+SUBMITTED_FORMATS = (
+    "%Y/%m/%d at %I:%M %p",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%m/%d/%Y %I:%M %p",
+    "%m/%d/%Y",
+)
+
+# Also used as a JavaScript RegExp by export_first_entry
+SUBMITTED_ON_PATTERN = r"Submitted on\s*:\s*(\d{4}/\d{1,2}/\d{1,2} at \d{1,2}:\d{2}\s*[AaPp][Mm])"
+SUBMITTED_ON_RE = re.compile(SUBMITTED_ON_PATTERN)
+
+
+def find_submitted_on(text: str) -> str:
+    """The "Submitted on" time in an entry page's text, or ""."""
+    m = SUBMITTED_ON_RE.search(text)
+    return " ".join(m.group(1).split()) if m else ""
+
+
+def utc_to_site(value: str) -> str:
+    """A UTC "YYYY-MM-DD HH:MM:SS" as site time in the same format; unreadable values pass through."""
+    try:
+        utc = datetime.strptime(str(value).strip(), "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+    except ValueError:
+        return value
+    site = utc.astimezone(ZoneInfo(Config.WP_TIMEZONE)) if Config.WP_TIMEZONE else utc.astimezone()
+    return site.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def parse_submitted(value: str) -> Optional[datetime]:
+    value = " ".join(str(value or "").split())
+    for fmt in SUBMITTED_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
@@ -2,17 +2,23 @@
 Export a Gravity Forms entry by parsing the visible text content.
 
 Flow:
-- Login using env (WP_USERNAME/WP_PASSWORD) and open ENTRY_ID
+- Login using env (WP_USERNAME/WP_PASSWORD), reusing a cached session, and open ENTRY_ID
 - Save visible text from #wpbody-content
-- Parse label/value pairs from consecutive lines
-- Save to CSV and JSON with timestamp and entry id
+- Parse label/value pairs from consecutive lines; an empty page is reloaded
+  with backoff (retry.py) and never written as an empty CSV
+- Save to CSV and JSON with timestamp and entry id (or upsert into the
+  entry store when ENTRY_STORE is set)
+
+`--parse dump.txt ...` streams existing dumps (any number of entries each)
+through iter_text_entries and prints one JSON object per entry.
 """
 import csv
 import json
 import os
+import re
 import sys
 from datetime import datetime
-from typing import Dict, List, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -20,8 +26,12 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 
 from config import Config
-from export_first_entry import open_entry_by_id
-from login_agent import build_driver, perform_login
+from daemon_client import daemon_request
+from entry_store import EntryStore
+from export_first_entry import get_form_id_from_admin_url, open_entry_by_id
+from login_agent import navigation_stats
+from retry import DriverSession, EmptyEntryError, retry_call
+from tracing import traced
 
 
 KNOWN_LABELS = {
@@ -45,18 +55,35 @@ SECTION_HEADERS = {
 }
 
 
-def save_visible_text(driver) -> str:
+def wait_for_entry_content(driver) -> None:
+    try:
+        WebDriverWait(driver, max(Config.PAGE_LOAD_TIMEOUT, 60)).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "#wpbody-content"))
+        )
+    except TimeoutException:
+        pass
+
+
+@traced("wp.scrape.text", outcome=lambda text: "ok" if text else "empty")
+def read_visible_text(driver) -> str:
+    try:
+        return driver.find_element(By.CSS_SELECTOR, "#wpbody-content").text
+    except Exception:
+        return ""
+
+
+@traced("write.text")
+def write_visible_text(text: str) -> str:
     out_dir = os.path.dirname(os.path.abspath(__file__))
     ts = datetime.now().strftime("%Y%m%d_%H%M%S")
     txt_path = os.path.join(out_dir, f"entry_visible_{ts}.txt")
-    try:
-        container = driver.find_element(By.CSS_SELECTOR, "#wpbody-content")
-        text = container.text
-        with open(txt_path, "w", encoding="utf-8") as f:
-            f.write(text)
-        return txt_path
-    except Exception:
-        return txt_path
+    with open(txt_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    return txt_path
+
+
+def save_visible_text(driver) -> str:
+    return write_visible_text(read_visible_text(driver))
 
 
 def parse_text_lines(lines: List[str]) -> List[Tuple[str, str]]:
@@ -92,6 +119,80 @@ def parse_text_lines(lines: List[str]) -> List[Tuple[str, str]]:
     return pairs
 
 
+# Sidebar fields shown as "Label: value" on the entry page
+ENTRY_META_LABELS = {
+    "Entry Id",
+    "Submitted on",
+    "Updated on",
+    "User IP",
+    "Embed Url",
+    "Source URL",
+    "Payment Status",
+    "Transaction Id",
+}
+
+ENTRY_HEADER_RE = re.compile(r"^(?P<form>.+?)\s*:\s*Entry\s*#\s*(?P<entry_id>\d+)\s*$")
+
+# Precompiled line lookup: one dict probe per line instead of set scans and splits
+_LABEL = 1
+_SECTION = 2
+_LINE_KINDS = {**{label: _LABEL for label in KNOWN_LABELS}, **{header: _SECTION for header in SECTION_HEADERS}}
+_COLON_LABELS = frozenset(KNOWN_LABELS | ENTRY_META_LABELS)
+
+
+def iter_text_entries(lines: Iterable[str]) -> Iterator[Dict[str, str]]:
+    """Stream records out of a visible-text dump holding any number of entries.
+
+    Entries start at their "<form> : Entry # N" header; lines before the first
+    header (page chrome) are skipped. Each record carries "form" and
+    "Entry Id" plus the known labels, and colon pairs only for known/sidebar
+    labels, so notes and panel captions are not picked up.
+    """
+    record: Optional[Dict[str, str]] = None
+    pending = ""
+    for raw in lines:
+        line = raw.strip()
+        header = ENTRY_HEADER_RE.match(line) if "Entry" in line else None
+        if header:
+            if record is not None:
+                yield record
+            record = {"form": header.group("form"), "Entry Id": header.group("entry_id")}
+            pending = ""
+            continue
+        if record is None:
+            continue
+        if pending:
+            # Value is the line right after a known label, as in parse_text_lines
+            label, pending = pending, ""
+            if line:
+                record[label] = line
+                continue
+        if not line:
+            continue
+        kind = _LINE_KINDS.get(line)
+        if kind == _SECTION:
+            continue
+        if kind == _LABEL:
+            pending = line
+            continue
+        if ":" in line:
+            label, _, value = line.partition(":")
+            label = label.rstrip()
+            if label in _COLON_LABELS:
+                value = value.strip()
+                if value:
+                    record[label] = value
+    if record is not None:
+        yield record
+
+
+def iter_text_file_entries(path: str) -> Iterator[Dict[str, str]]:
+    """Stream records out of a dump file without reading it into memory."""
+    with open(path, "r", encoding="utf-8") as f:
+        yield from iter_text_entries(f)
+
+
+@traced("write.entry", entry_arg="entry_id")
 def write_outputs(entry_id: str, pairs: List[Tuple[str, str]]) -> Tuple[str, str]:
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     base = f"entry_{entry_id}_{timestamp}"
@@ -112,36 +213,69 @@ def write_outputs(entry_id: str, pairs: List[Tuple[str, str]]) -> Tuple[str, str
     return csv_path, json_path
 
 
+def save_entry(entry_id: str, txt_path: str) -> int:
+    with open(txt_path, "r", encoding="utf-8") as f:
+        lines = [ln.rstrip("\n") for ln in f]
+    pairs = parse_text_lines(lines)
+    print(f"Saved text: {txt_path}")
+    if not pairs:
+        print(f"Entry {entry_id}: no fields found; nothing written.")
+        return 1
+    if Config.ENTRY_STORE:
+        with EntryStore() as store:
+            store.upsert(get_form_id_from_admin_url(Config.WP_ADMIN_URL), entry_id, {k: v for k, v in pairs})
+        print(f"Stored entry {entry_id} in: {Config.ENTRY_STORE}")
+        return 0
+    csv_path, json_path = write_outputs(entry_id, pairs)
+    print(f"Wrote CSV: {csv_path}")
+    print(f"Wrote JSON: {json_path}")
+    return 0
+
+
 def main() -> int:
+    if len(sys.argv) > 2 and sys.argv[1] == "--parse":
+        # Parse an existing (multi-entry) text dump: one JSON object per entry on stdout
+        for path in sys.argv[2:]:
+            for record in iter_text_file_entries(path):
+                print(json.dumps(record, ensure_ascii=False))
+        return 0
+
     entry_id = os.getenv("ENTRY_ID", "") or (sys.argv[1] if len(sys.argv) > 1 else "")
     if not entry_id:
         print("Provide ENTRY_ID env or as first CLI arg.")
         return 2
 
-    driver = build_driver(headless=True)
+    # A running browser daemon skips Chrome start-up and login
+    reply = daemon_request("export", {"entry_id": entry_id})
+    if reply is not None:
+        if not reply.get("ok"):
+            print(f"Browser daemon error: {reply.get('error')}")
+            return 1
+        return save_entry(entry_id, write_visible_text(reply["text"]))
+
+    browser = DriverSession(headless=True)
     try:
-        perform_login(driver)
-        open_entry_by_id(driver, entry_id)
+        browser.start()
+
+        def _attempt() -> str:
+            open_entry_by_id(browser.driver, entry_id)
+            wait_for_entry_content(browser.driver)
+            text = read_visible_text(browser.driver)
+            if not parse_text_lines(text.splitlines()):
+                raise EmptyEntryError("no fields found")
+            return text
+
         try:
-            WebDriverWait(driver, max(Config.PAGE_LOAD_TIMEOUT, 60)).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "#wpbody-content"))
-            )
-        except TimeoutException:
-            pass
-        txt_path = save_visible_text(driver)
-        with open(txt_path, "r", encoding="utf-8") as f:
-            lines = [ln.rstrip("\n") for ln in f]
-        pairs = parse_text_lines(lines)
-        csv_path, json_path = write_outputs(entry_id, pairs)
-        print(f"Saved text: {txt_path}")
-        print(f"Wrote CSV: {csv_path}")
-        print(f"Wrote JSON: {json_path}")
-        return 0
+            text = retry_call(_attempt, f"Entry {entry_id}", browser.restart)
+        except EmptyEntryError:
+            # Keep the last page text for inspection; save_entry reports it empty
+            text = read_visible_text(browser.driver)
+        if Config.LEAN_LOADING:
+            stats = navigation_stats(browser.driver)
+            print(f"Page load: {stats['requests']} requests, {stats['blocked']} blocked, {stats['bytes'] / 1024:.0f} KiB received")
+        return save_entry(entry_id, write_visible_text(text))
     finally:
-        try:
-            driver.quit()
-        except Exception:
-            pass
+        browser.quit()
 
 
 if __name__ == "__main__":
@@ -7,10 +7,13 @@ Modes:
 
 Steps:
 - Launch Chrome via Selenium (same options as login_agent)
-- Log in using env vars (or runtime prompt fallback via login_agent)
+- Log in using env vars (or runtime prompt fallback via login_agent),
+  reusing the cached session from session_store when it is still valid
 - Navigate to target entry view
-- Scrape field label/value pairs
-- Write CSV (two columns: label,value) and JSON (object)
+- Scrape field label/value pairs (one execute_script round trip, element walk as fallback);
+  timeouts, driver crashes and empty pages are retried (retry.py)
+- Write CSV (two columns: label,value) and JSON (object), or upsert into
+  the entry store when ENTRY_STORE is set
 """
 import csv
 import json
@@ -26,7 +29,11 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
 from config import Config
-from login_agent import build_driver, wait_for_element, perform_login, ensure_on_entries_page
+from entry_time import SUBMITTED_ON_PATTERN, find_submitted_on
+from entry_store import EntryStore
+from login_agent import ensure_on_entries_page
+from retry import DriverSession, EmptyEntryError, retry_call
+from tracing import traced
 
 
 def click_first_entry(driver) -> None:
@@ -64,10 +71,16 @@ def get_form_id_from_admin_url(url: str) -> str:
     return str(form_ids[0])
 
 
-def open_entry_by_id(driver, entry_id: str) -> None:
+def entry_view_url(entry_id: str) -> str:
     form_id = get_form_id_from_admin_url(Config.WP_ADMIN_URL)
+    admin_base = Config.WP_ADMIN_URL.split("admin.php", 1)[0]
     # Gravity Forms entry view URL pattern
-    entry_url = f"https://dtcrxoptics.com/wp-admin/admin.php?page=gf_entries&view=entry&id={form_id}&lid={entry_id}"
+    return f"{admin_base}admin.php?page=gf_entries&view=entry&id={form_id}&lid={entry_id}"
+
+
+@traced("wp.open_entry", entry_arg="entry_id")
+def open_entry_by_id(driver, entry_id: str) -> None:
+    entry_url = entry_view_url(entry_id)
     try:
         driver.get(entry_url)
     except TimeoutException:
@@ -83,6 +96,7 @@ def open_entry_by_id(driver, entry_id: str) -> None:
         pass
 
 
+@traced("write.html", entry_arg="entry_id")
 def save_current_html(driver, entry_id: str) -> str:
     out_dir = os.path.dirname(os.path.abspath(__file__))
     path = os.path.join(out_dir, f"entry_{entry_id}_raw.html")
@@ -95,7 +109,30 @@ def save_current_html(driver, entry_id: str) -> str:
     return path
 
 
-def scrape_entry_fields(driver) -> List[Tuple[str, str]]:
+# Collects all three label/value patterns in one WebDriver round trip.
+# Mirrors the per-element walk in _scrape_entry_fields_by_element: innerText
+# is what WebElement.text returns, and the first non-empty pattern wins.
+SCRAPE_FIELDS_JS = """
+const text = (el) => (el ? (el.innerText || el.textContent || '') : '').trim();
+const th = [], dl = [], td = [];
+for (const row of document.querySelectorAll('table tr')) {
+    const labelEl = row.querySelector('th, td.label, td.column-label');
+    const valueEl = row.querySelector('td:not(.label):not(.column-label)');
+    if (labelEl && valueEl) th.push([text(labelEl), text(valueEl)]);
+    const tds = row.getElementsByTagName('td');
+    if (tds.length >= 2) td.push([text(tds[0]), text(tds[1])]);
+}
+for (const dt of document.querySelectorAll('dl dt')) {
+    let dd = dt.nextElementSibling;
+    while (dd && dd.tagName !== 'DD') dd = dd.nextElementSibling;
+    dl.push([text(dt), text(dd)]);
+}
+const submitted = (document.body.innerText || '').match(new RegExp(arguments[0]));
+return JSON.stringify({th: th, dl: dl, td: td, submitted: submitted ? submitted[1] : ''});
+"""
+
+
+def wait_for_entry_view(driver) -> None:
     # Wait for entry view page to load
     try:
         WebDriverWait(driver, Config.PAGE_LOAD_TIMEOUT).until(
@@ -108,6 +145,35 @@ def scrape_entry_fields(driver) -> List[Tuple[str, str]]:
     except TimeoutException:
         pass
 
+
+@traced("wp.scrape.fields", outcome=lambda pairs: "ok" if pairs else "empty")
+def scrape_entry_fields(driver) -> List[Tuple[str, str]]:
+    wait_for_entry_view(driver)
+    try:
+        payload = json.loads(driver.execute_script(SCRAPE_FIELDS_JS, SUBMITTED_ON_PATTERN))
+    except Exception:
+        # Script blocked or returned garbage; walk the elements one by one
+        pairs = _scrape_entry_fields_by_element(driver)
+        try:
+            submitted = find_submitted_on(driver.find_element(By.TAG_NAME, "body").text)
+        except Exception:
+            submitted = ""
+        return with_submitted_on(pairs, submitted)
+    for pattern in ("th", "dl", "td"):
+        pairs = [(label, value) for label, value in payload.get(pattern, []) if label and value]
+        if pairs:
+            return with_submitted_on(pairs, " ".join(payload.get("submitted", "").split()))
+    return []
+
+
+def with_submitted_on(pairs: List[Tuple[str, str]], submitted: str) -> List[Tuple[str, str]]:
+    """Add the sidebar's submit time (not part of the field table) to the scraped pairs."""
+    if pairs and submitted and not any(label == "Submitted on" for label, _ in pairs):
+        pairs.append(("Submitted on", submitted))
+    return pairs
+
+
+def _scrape_entry_fields_by_element(driver) -> List[Tuple[str, str]]:
     pairs: List[Tuple[str, str]] = []
 
     # Pattern 1: table rows with th/td
@@ -159,6 +225,7 @@ def scrape_entry_fields(driver) -> List[Tuple[str, str]]:
     return pairs
 
 
+@traced("write.entry")
 def write_outputs(pairs: List[Tuple[str, str]]) -> Tuple[str, str]:
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     base = f"first_entry_{timestamp}"
@@ -191,30 +258,42 @@ def main() -> int:
     if not entry_id:
         entry_id = os.getenv("ENTRY_ID", "")
 
-    driver = build_driver(headless=Config.HEADLESS_MODE)
+    browser = DriverSession()
     try:
-        perform_login(driver)
-        ensure_on_entries_page(driver)
-        if entry_id:
-            open_entry_by_id(driver, entry_id)
-            saved_path = save_current_html(driver, entry_id)
-        else:
-            click_first_entry(driver)
-        pairs = scrape_entry_fields(driver)
-        if not pairs:
-            print("No fields found on the first entry page.")
+        browser.start()
+
+        def _attempt() -> List[Tuple[str, str]]:
+            if entry_id:
+                open_entry_by_id(browser.driver, entry_id)
+            else:
+                ensure_on_entries_page(browser.driver)
+                click_first_entry(browser.driver)
+            pairs = scrape_entry_fields(browser.driver)
+            if not pairs:
+                raise EmptyEntryError("no fields found")
+            return pairs
+
+        try:
+            pairs = retry_call(_attempt, f"Entry {entry_id or '(first)'}", browser.restart)
+        except EmptyEntryError:
+            print("No fields found on the entry page; nothing written.")
+            return 1
         if entry_id:
+            saved_path = save_current_html(browser.driver, entry_id)
             print(f"Saved raw HTML for entry {entry_id} to: {saved_path}")
+        record: Dict[str, str] = {label: value for label, value in pairs}
+        store_id = entry_id or record.get("Entry Id", "")
+        if Config.ENTRY_STORE and store_id:
+            with EntryStore() as store:
+                store.upsert(get_form_id_from_admin_url(Config.WP_ADMIN_URL), store_id, record)
+            print(f"Stored entry {store_id} in: {Config.ENTRY_STORE}")
+            return 0
         csv_path, json_path = write_outputs(pairs)
         print(f"Wrote CSV: {csv_path}")
         print(f"Wrote JSON: {json_path}")
         return 0
     finally:
-        try:
-            driver.quit()
-        except Exception:
-            pass
-
+        browser.quit()
 
 if __name__ == "__main__":
     sys.exit(main())
@@ -0,0 +1,237 @@
+"""
+Export a whole form through Gravity Forms' own "Import/Export -> Export Entries".
+
+- Logs in (cached session or perform_login), opens
+  admin.php?page=gf_export&view=export_entry, picks the form id from
+  WP_ADMIN_URL, selects every field and an optional date window
+- Chrome downloads the CSV into a scratch directory (DevTools download
+  behavior), which is then moved next to the outputs as
+  gf_export_form<id>_<timestamp>.csv
+- Columns are renamed to the labels the mapping stage expects, reusing the
+  REST exporter's label_for_input ("Name (First)" -> "First Name",
+  "Entry Date" -> "Submitted on"); checkbox columns sharing a label are
+  joined, while a product's price stays in its own "Product (Price)" column
+- Records are written with batch_export.write_results (JSONL + CSV, or the
+  entry store)
+
+One download replaces a page load per entry. `--csv FILE` normalizes an
+already downloaded export without a browser.
+"""
+import argparse
+import csv
+import os
+import re
+import shutil
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, Iterator, Tuple
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import Select, WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
+
+from config import Config
+from batch_export import write_results
+from export_entry_by_text import KNOWN_LABELS
+from export_first_entry import get_form_id_from_admin_url
+from gf_rest_api import label_for_input
+from login_agent import build_driver
+from session_store import login_with_session
+from tracing import span, traced
+
+
+# Fixed entry columns in the export and the labels the rest of the pipeline uses
+ENTRY_COLUMNS = {
+    "Entry Id": "Entry Id",
+    "Entry ID": "Entry Id",
+    "Entry Date": "Submitted on",
+    "Date Updated": "Updated on",
+    "Source Url": "Embed Url",
+    "User IP": "User IP",
+    "Status": "Status",
+}
+
+# Sub-inputs that hold something other than the field's value: kept in their
+# own column ("Product (Price)") instead of being joined into the field
+SEPARATE_INPUTS = {"Price"}
+
+SUB_INPUT_RE = re.compile(r"^(?P<field>.+?) \((?P<input>[^()]*)\)$")
+
+
+def export_page_url() -> str:
+    admin_base = Config.WP_ADMIN_URL.split("admin.php", 1)[0]
+    return f"{admin_base}admin.php?page=gf_export&view=export_entry"
+
+
+def normalize_header(header: str) -> str:
+    header = header.strip()
+    if header in ENTRY_COLUMNS:
+        return ENTRY_COLUMNS[header]
+    m = SUB_INPUT_RE.match(header)
+    if not m:
+        return header
+    field_label, input_label = m.group("field"), m.group("input")
+    if input_label in SEPARATE_INPUTS:
+        return header
+    label = label_for_input(field_label, input_label)
+    if label == header and field_label in KNOWN_LABELS:
+        # One column per checkbox/consent choice: keep the field's own label
+        return field_label
+    return label
+
+
+def iter_export_records(path: str, form_name: str = "") -> Iterator[Dict[str, str]]:
+    """Stream normalized records out of a Gravity Forms export CSV."""
+    with open(path, "r", newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        try:
+            headers = next(reader)
+        except StopIteration:
+            return
+        labels = [normalize_header(h) for h in headers]
+        for row in reader:
+            record: Dict[str, str] = {}
+            for label, value in zip(labels, row):
+                value = value.strip()
+                if not label or not value:
+                    continue
+                # Checkbox choices share one label; join them like the entry view does
+                record[label] = f"{record[label]}, {value}" if label in record else value
+            if not record.get("Entry Id"):
+                continue
+            if form_name:
+                record.setdefault("form", form_name)
+            yield record
+
+
+def enable_downloads(driver, directory: str) -> None:
+    params = {"behavior": "allow", "downloadPath": directory}
+    try:
+        driver.execute_cdp_cmd("Browser.setDownloadBehavior", params)
+    except Exception:
+        # Older Chrome builds only know the Page domain variant
+        driver.execute_cdp_cmd("Page.setDownloadBehavior", params)
+
+
+def wait_for_download(directory: str, timeout: int) -> str:
+    """Return the finished CSV in directory, or "" when nothing arrived in time."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        names = os.listdir(directory)
+        done = [n for n in names if n.lower().endswith(".csv")]
+        if done and not any(n.endswith(".crdownload") for n in names):
+            return os.path.join(directory, done[0])
+        time.sleep(0.5)
+    return ""
+
+
+def select_form(driver, form_id: str) -> str:
+    """Pick the form in the export screen; return its title."""
+    select_el = WebDriverWait(driver, Config.PAGE_LOAD_TIMEOUT).until(
+        EC.presence_of_element_located((By.ID, "export_form"))
+    )
+    select = Select(select_el)
+    select.select_by_value(str(form_id))
+    form_name = select.first_selected_option.text.strip()
+    # The field list is loaded over AJAX once a form is chosen
+    WebDriverWait(driver, Config.PAGE_LOAD_TIMEOUT).until(
+        EC.presence_of_element_located((By.CSS_SELECTOR, "#export_field_list input[type='checkbox']"))
+    )
+    return form_name
+
+
+def select_all_fields(driver) -> None:
+    driver.execute_script(
+        "document.querySelectorAll(\"#export_field_list input[type='checkbox']\")"
+        ".forEach(cb => { if (!cb.checked) cb.click(); });"
+    )
+
+
+def set_date_window(driver, start: str, end: str) -> None:
+    for element_id, value in (("export_date_start", start), ("export_date_end", end)):
+        if value:
+            driver.execute_script(
+                "const el = document.getElementById(arguments[0]); if (el) { el.value = arguments[1]; }",
+                element_id, value,
+            )
+
+
+@traced("gf.export.download")
+def download_export(driver, form_id: str, start: str = "", end: str = "", timeout: int = 0) -> Tuple[str, str]:
+    """Run the native export and return (downloaded CSV path, form title)."""
+    timeout = timeout or Config.GF_EXPORT_TIMEOUT
+    scratch = tempfile.mkdtemp(prefix="gf_export_")
+    enable_downloads(driver, scratch)
+    try:
+        driver.get(export_page_url())
+    except TimeoutException:
+        pass
+    form_name = select_form(driver, form_id)
+    select_all_fields(driver)
+    set_date_window(driver, start, end)
+    driver.find_element(By.ID, "submit_button").click()
+
+    path = wait_for_download(scratch, timeout)
+    if not path:
+        shutil.rmtree(scratch, ignore_errors=True)
+        raise TimeoutError(f"No export file after {timeout}s")
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    out_dir = os.path.dirname(os.path.abspath(__file__))
+    final_path = os.path.join(out_dir, f"gf_export_form{form_id}_{ts}.csv")
+    shutil.move(path, final_path)
+    shutil.rmtree(scratch, ignore_errors=True)
+    return final_path, form_name
+
+
+def _valid_date(value: str) -> str:
+    if value:
+        datetime.strptime(value, "%Y-%m-%d")
+    return value
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Export a whole form with Gravity Forms' native CSV export.")
+    parser.add_argument("--start", type=_valid_date, default="", help="First day (YYYY-MM-DD), inclusive")
+    parser.add_argument("--end", type=_valid_date, default="", help="Last day (YYYY-MM-DD), inclusive")
+    parser.add_argument("--form-id", default="", help="Form id (default: from WP_ADMIN_URL)")
+    parser.add_argument("--csv", default="", help="Normalize an already downloaded export instead")
+    parser.add_argument("--form-name", default="", help="Form title to record with --csv")
+    parser.add_argument("--out", default="", help="Output path prefix (default: entries_<timestamp>)")
+    args = parser.parse_args()
+
+    form_id = args.form_id or get_form_id_from_admin_url(Config.WP_ADMIN_URL)
+    form_name = args.form_name
+    csv_path = args.csv
+    if csv_path:
+        if not os.path.exists(csv_path):
+            print(f"File not found: {csv_path}")
+            return 2
+    else:
+        driver = build_driver(headless=Config.HEADLESS_MODE)
+        try:
+            login_with_session(driver)
+            csv_path, form_name = download_export(driver, form_id, args.start, args.end)
+        except (TimeoutException, TimeoutError, NoSuchElementException) as e:
+            # Missing form select or submit button: not the export screen we expect
+            print(f"Export failed: {e}")
+            return 1
+        finally:
+            try:
+                driver.quit()
+            except Exception:
+                pass
+        print(f"Downloaded: {csv_path}")
+
+    with span("gf.export.normalize"):
+        records = iter_export_records(csv_path, form_name)
+        paths, exported, empty = write_results(((r["Entry Id"], r) for r in records), args.out, form_id)
+    print(f"Exported {exported} entries ({empty} empty)")
+    for path in paths:
+        print(f"Wrote: {path}")
+    return 0 if exported else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
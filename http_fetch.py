@@ -0,0 +1,169 @@
+"""
+Fetch Gravity Forms entry pages over plain HTTP instead of through Selenium.
+
+- Cookies come from the cached session (session_store) or, when that is
+  stale, from a browser that logs in once via login_with_session; cookies
+  that expire mid-run are renewed from that browser.
+- Cookies are moved into a keep-alive requests.Session whose connection
+  pool is sized to the requested concurrency.
+- Entry HTML is parsed with parse_saved_entry.parse_entry_html.
+- Pages that come back without any label/value pairs (e.g. rendered by JS)
+  are returned as None so the caller can retry them in the browser.
+- Connection errors, timeouts and HTTP 429/5xx are retried with backoff
+  (retry.retry_call) before an entry counts as failed.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from selenium.common.exceptions import TimeoutException
+
+from config import Config
+from batch_export import extract_entry_with_retry
+from export_first_entry import entry_view_url
+from parse_saved_entry import parse_entry_html
+from retry import DriverSession, retry_call
+from session_store import clear_session, is_logged_in, load_session, login_with_session, session_is_fresh
+from tracing import traced
+
+
+class SessionExpiredError(RuntimeError):
+    """Raised when wp-admin redirects an HTTP fetch to the login page."""
+
+
+def session_from_cookies(cookies: List[Dict], user_agent: str = "", pool_size: int = 1) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if user_agent:
+        session.headers["User-Agent"] = user_agent
+    for c in cookies:
+        session.cookies.set(c["name"], c["value"], domain=c.get("domain", ""), path=c.get("path", "/"))
+    return session
+
+
+def session_from_driver(driver, pool_size: int = 1) -> requests.Session:
+    try:
+        user_agent = driver.execute_script("return navigator.userAgent") or ""
+    except Exception:
+        user_agent = ""
+    return session_from_cookies(driver.get_cookies(), user_agent, pool_size)
+
+
+def cached_http_session(pool_size: int = 1) -> Optional[requests.Session]:
+    """Build a session straight from the cookie cache, without starting Chrome."""
+    if not Config.SESSION_CACHE:
+        return None
+    data = load_session()
+    if not session_is_fresh(data):
+        return None
+    return session_from_cookies(data["cookies"], data.get("user_agent", ""), pool_size)
+
+
+def fetch_entry_html(session: requests.Session, entry_id: str) -> str:
+    resp = session.get(entry_view_url(entry_id), timeout=Config.PAGE_LOAD_TIMEOUT)
+    if "wp-login.php" in resp.url:
+        raise SessionExpiredError("WordPress session expired")
+    resp.raise_for_status()
+    return resp.text
+
+
+@traced("wp.http.fetch", entry_arg="entry_id", outcome=lambda record: "ok" if record else "needs_browser")
+def fetch_entry(session: requests.Session, entry_id: str) -> Optional[Dict[str, str]]:
+    """Return the parsed entry, or None when the page needs a browser."""
+    record = parse_entry_html(fetch_entry_html(session, entry_id))
+    if not record:
+        return None
+    record.setdefault("Entry Id", entry_id)
+    return record
+
+
+def fetch_entries(
+    session: requests.Session,
+    entry_ids: Iterable[str],
+    workers: int = 1,
+) -> Iterator[Tuple[str, Optional[Dict[str, str]]]]:
+    """Fetch entries (optionally concurrently), yielding results in input order."""
+    entry_ids = list(entry_ids)
+
+    def _one(entry_id: str) -> Optional[Dict[str, str]]:
+        try:
+            return retry_call(lambda: fetch_entry(session, entry_id), f"Entry {entry_id} HTTP fetch")
+        except SessionExpiredError:
+            raise
+        except Exception as e:
+            print(f"Entry {entry_id} HTTP fetch failed: {e}")
+            return None
+
+    if workers <= 1:
+        for entry_id in entry_ids:
+            yield entry_id, _one(entry_id)
+        return
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for entry_id, record in zip(entry_ids, pool.map(_one, entry_ids)):
+            yield entry_id, record
+
+
+def refresh_browser_login(browser: DriverSession) -> None:
+    """Make sure the running browser is still logged in; log it in again when not."""
+    try:
+        browser.driver.get(Config.WP_ADMIN_URL)
+    except TimeoutException:
+        pass
+    if not is_logged_in(browser.driver):
+        clear_session()
+        login_with_session(browser.driver)
+    browser.cookies = browser.driver.get_cookies()
+
+
+def export_entries_http(
+    entry_ids: Iterable[str],
+    workers: int = 1,
+    mode: str = "text",
+) -> Iterator[Tuple[str, Dict[str, str]]]:
+    """HTTP-first export; Chrome is only started for login or JS-only pages."""
+    remaining = list(entry_ids)
+    browser: Optional[DriverSession] = None
+
+    def _browser() -> DriverSession:
+        nonlocal browser
+        if browser is None:
+            browser = DriverSession()
+            browser.start()
+        return browser
+
+    try:
+        session = cached_http_session(workers) or session_from_driver(_browser().driver, workers)
+        refreshed = False
+        while remaining:
+            done = 0
+            try:
+                for entry_id, record in fetch_entries(session, remaining, workers):
+                    if record is None:
+                        print(f"Entry {entry_id}: falling back to browser")
+                        try:
+                            record = extract_entry_with_retry(_browser(), entry_id, mode)
+                        except Exception as e:
+                            print(f"Entry {entry_id} failed: {e}")
+                            record = {}
+                    done += 1
+                    yield entry_id, record
+                remaining = []
+            except SessionExpiredError:
+                if refreshed and not done:
+                    raise  # even the freshly logged-in cookies were rejected
+                remaining = remaining[done:]
+                if browser is None:
+                    # Cached cookies were rejected; log in once and carry on
+                    clear_session()
+                    _browser()
+                else:
+                    # Cookies expired during the run; renew them from the browser
+                    refresh_browser_login(browser)
+                session = session_from_driver(browser.driver, workers)
+                refreshed = True
+    finally:
+        if browser is not None:
+            browser.quit()
@@ -0,0 +1,180 @@
+"""
+Export only the Gravity Forms entries created since the last run.
+
+- A watermark (last exported entry id and its date created) is kept per
+  form in WATERMARK_FILE.
+- The entries list is paged newest to oldest until an entry at or below the
+  watermark is reached, either through the REST API (--source rest, default
+  when GF_API_KEY/GF_API_SECRET are set) or the wp-admin list (--source browser).
+- New entries are exported oldest first into one consolidated JSONL/CSV pair,
+  at most MAX_ENTRIES per run (the rest follow on the next run).
+  Once the output is written and closed, the watermark moves past the
+  exported entries up to the first failure, so a failed entry (or a run that
+  crashed before its output was complete) is picked up again next run.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, Iterator, List, Tuple
+
+from selenium.common.exceptions import TimeoutException
+
+from config import Config
+from batch_export import export_entries, write_results
+from export_first_entry import get_form_id_from_admin_url
+from retry import DriverSession
+from tracing import traced
+
+
+# Entry ids linked from the current wp-admin entries list page
+LIST_ENTRY_IDS_JS = """
+const ids = [];
+for (const a of document.querySelectorAll("a[href*='view=entry']")) {
+    const m = /[?&]lid=(\\d+)/.exec(a.getAttribute('href') || '');
+    if (m && !ids.includes(m[1])) ids.push(m[1]);
+}
+return ids;
+"""
+
+
+def watermark_path() -> str:
+    path = Config.WATERMARK_FILE
+    if os.path.isabs(path):
+        return path
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), path)
+
+
+def load_watermarks() -> Dict[str, Dict]:
+    path = watermark_path()
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_watermark(form_id: str) -> Dict:
+    return load_watermarks().get(str(form_id), {})
+
+
+def save_watermark(form_id: str, entry_id: str, date_created: str = "") -> None:
+    marks = load_watermarks()
+    marks[str(form_id)] = {
+        "entry_id": str(entry_id),
+        "date_created": date_created,
+        "updated_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    path = watermark_path()
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(marks, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def entries_list_url(page: int) -> str:
+    sep = "&" if "?" in Config.WP_ADMIN_URL else "?"
+    return f"{Config.WP_ADMIN_URL}{sep}orderby=id&order=desc&paged={page}"
+
+
+@traced("wp.list_ids")
+def list_new_ids_browser(driver, since_id: int) -> List[str]:
+    """Page the wp-admin entries list newest first; return ids above since_id."""
+    new_ids: List[str] = []
+    seen = set()
+    page = 1
+    while True:
+        try:
+            driver.get(entries_list_url(page))
+        except TimeoutException:
+            pass
+        page_ids = [i for i in (driver.execute_script(LIST_ENTRY_IDS_JS) or []) if i not in seen]
+        if not page_ids:
+            break
+        seen.update(page_ids)
+        for entry_id in page_ids:
+            if int(entry_id) <= since_id:
+                return new_ids
+            new_ids.append(entry_id)
+        page += 1
+    return new_ids
+
+
+@traced("gf.api.list")
+def list_new_entries_rest(form_id: str, since_id: int) -> List[Dict[str, str]]:
+    """Newest-first REST pages until the watermark; returns records newest first."""
+    # Imported here so the browser source works without REST credentials
+    from gf_rest_api import build_api_session, entry_to_record, fetch_form_labels, iter_entry_pages
+
+    session = build_api_session()
+    labels = fetch_form_labels(session, form_id)
+    records: List[Dict[str, str]] = []
+    # No MAX_ENTRIES cap while scanning: the oldest new entries must be seen
+    for page in iter_entry_pages(session, form_id, max_entries=sys.maxsize):
+        for entry in page:
+            if int(entry.get("id", 0)) <= since_id:
+                return records
+            records.append(entry_to_record(entry, labels))
+    return records
+
+
+def track_watermark(
+    results: Iterator[Tuple[str, Dict[str, str]]],
+    mark: Dict[str, str],
+) -> Iterator[Tuple[str, Dict[str, str]]]:
+    """Pass results through, noting in mark the last entry of the leading run of successes."""
+    blocked = False
+    for entry_id, record in results:
+        if len(record) <= 1:
+            blocked = True
+        elif not blocked:
+            mark.update(entry_id=entry_id, date_created=record.get("Submitted on", ""))
+        yield entry_id, record
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Export Gravity Forms entries created since the last run.")
+    default_source = "rest" if Config.GF_API_KEY and Config.GF_API_SECRET else "browser"
+    parser.add_argument("--source", choices=["rest", "browser"], default=default_source)
+    parser.add_argument("--form-id", default="", help="Form id (default: from WP_ADMIN_URL)")
+    parser.add_argument("--since", type=int, default=None, help="Override the stored watermark entry id")
+    parser.add_argument("--out", default="", help="Output path prefix (default: entries_<timestamp>)")
+    args = parser.parse_args()
+
+    form_id = args.form_id or get_form_id_from_admin_url(Config.WP_ADMIN_URL)
+    mark = load_watermark(form_id)
+    since_id = args.since if args.since is not None else int(mark.get("entry_id") or 0)
+    print(f"Form {form_id}: exporting entries after #{since_id}")
+
+    browser = None
+    try:
+        if args.source == "rest":
+            records = list_new_entries_rest(form_id, since_id)[::-1][:Config.MAX_ENTRIES]
+            results = ((r["Entry Id"], r) for r in records)
+            total = len(records)
+        else:
+            browser = DriverSession()
+            browser.start()
+            new_ids = list_new_ids_browser(browser.driver, since_id)[::-1][:Config.MAX_ENTRIES]
+            results = export_entries(browser, new_ids)
+            total = len(new_ids)
+        if not total:
+            print("No new entries.")
+            return 0
+        mark: Dict[str, str] = {}
+        paths, exported, empty = write_results(track_watermark(results, mark), args.out, form_id)
+        # write_results has closed its files; only now can the watermark move past them
+        if mark:
+            save_watermark(form_id, mark["entry_id"], mark["date_created"])
+        print(f"Exported {exported}/{total} new entries ({empty} empty)")
+        for path in paths:
+            print(f"Wrote: {path}")
+        print(f"Watermark: {load_watermark(form_id)}")
+        return 0 if exported == total else 1
+    finally:
+        if browser is not None:
+            browser.quit()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,225 @@
+"""
+Match Gravity Forms product strings to NetSuite items.
+
+- Built once per process from a NetSuite item export (saved search or
+  Lists -> Items -> Export as CSV) at NS_ITEM_CATALOG: the Internal ID column
+  plus every name column present (Name, Item Name/Number, Display Name);
+  inactive items are left out
+- Names are normalized to tokens (case, punctuation and brackets ignored),
+  so "XL Vise Z87 Clear (NO RX)" and "Vise Z87 Clear XL - No Rx" are the
+  same item
+- Exact lookup is a dict probe on the sorted tokens; otherwise only items
+  whose every name token appears in the product are candidates (extra words
+  in the product are fine, a differing size or colour is not), scored by
+  token overlap (Dice); the best one wins when it reaches NS_ITEM_MATCH_MIN
+  and no other item ties with it
+- Results are memoized per product string, so repeat products cost one
+  dict lookup
+
+`python item_catalog.py entry_*.json entries.jsonl` lists how every distinct
+product resolves and exits 1 when some do not, before anything is submitted.
+"""
+import argparse
+import csv
+import json
+import os
+import re
+from collections import defaultdict
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Tuple
+
+from config import Config
+
+
+ID_COLUMNS = ("Internal ID", "Internal Id", "internalid", "id")
+NAME_COLUMNS = ("Name", "Item Name/Number", "itemid", "Display Name", "displayname")
+INACTIVE_COLUMNS = ("Inactive", "isinactive")
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+class CatalogItem(NamedTuple):
+    internal_id: str
+    name: str
+
+
+def normalize_tokens(text: str) -> FrozenSet[str]:
+    return frozenset(TOKEN_RE.findall(str(text).lower()))
+
+
+def _token_key(tokens: FrozenSet[str]) -> str:
+    return " ".join(sorted(tokens))
+
+
+class ItemCatalog:
+    def __init__(self, items: Iterable[Tuple[str, Iterable[str]]], min_score: float = 0.0):
+        """items: (internal id, names); the first name is the one NetSuite shows."""
+        self.min_score = min_score or Config.NS_ITEM_MATCH_MIN
+        self._exact: Dict[str, Optional[CatalogItem]] = {}
+        self._tokens: List[FrozenSet[str]] = []
+        self._entries: List[CatalogItem] = []
+        self._by_token: Dict[str, List[int]] = defaultdict(list)
+        self._memo: Dict[str, Optional[CatalogItem]] = {}
+        ids = set()
+        for internal_id, names in items:
+            names = [n for n in names if n]
+            if not internal_id or not names:
+                continue
+            item = CatalogItem(internal_id, names[0])
+            ids.add(internal_id)
+            for name in names:
+                tokens = normalize_tokens(name)
+                if not tokens:
+                    continue
+                key = _token_key(tokens)
+                current = self._exact.get(key, item)
+                # Two items normalizing to the same name: neither is an exact match
+                self._exact[key] = item if current is not None and current.internal_id == internal_id else None
+                position = len(self._entries)
+                self._entries.append(item)
+                self._tokens.append(tokens)
+                for token in tokens:
+                    self._by_token[token].append(position)
+        self.size = len(ids)
+
+    def __len__(self) -> int:
+        return self.size
+
+    @classmethod
+    def from_csv(cls, path: str, min_score: float = 0.0) -> "ItemCatalog":
+        with open(path, "r", newline="", encoding="utf-8-sig") as f:
+            reader = csv.DictReader(f)
+            columns = reader.fieldnames or []
+            id_column = next((c for c in ID_COLUMNS if c in columns), "")
+            if not id_column:
+                raise ValueError(f"{path}: no Internal ID column")
+            name_columns = [c for c in NAME_COLUMNS if c in columns]
+            if not name_columns:
+                raise ValueError(f"{path}: no Name or Display Name column")
+            inactive_column = next((c for c in INACTIVE_COLUMNS if c in columns), "")
+
+            def _items():
+                for row in reader:
+                    if inactive_column and (row.get(inactive_column) or "").strip().lower() in ("yes", "t", "true"):
+                        continue
+                    names = [(row.get(c) or "").strip() for c in name_columns]
+                    # Sub-items export as "Parent : Child"; the child part is the item's own name
+                    names += [n.rsplit(" : ", 1)[-1] for n in names if " : " in n]
+                    yield (row.get(id_column) or "").strip(), names
+
+            return cls(_items(), min_score)
+
+    def exact(self, product: str) -> Optional[CatalogItem]:
+        return self._exact.get(_token_key(normalize_tokens(product)))
+
+    def _fuzzy(self, tokens: FrozenSet[str]) -> Optional[CatalogItem]:
+        overlap: Dict[int, int] = defaultdict(int)
+        for token in tokens:
+            for position in self._by_token.get(token, ()):
+                overlap[position] += 1
+        best: Optional[CatalogItem] = None
+        best_score = 0.0
+        tied = False
+        for position, shared in overlap.items():
+            if shared < len(self._tokens[position]):
+                # The item has a token the product lacks (another size, colour, ...)
+                continue
+            score = 2.0 * shared / (len(tokens) + len(self._tokens[position]))
+            item = self._entries[position]
+            if score > best_score:
+                best, best_score, tied = item, score, False
+            elif score == best_score and best is not None and item.internal_id != best.internal_id:
+                tied = True
+        if best is None or tied or best_score < self.min_score:
+            return None
+        return best
+
+    def lookup(self, product: str) -> Optional[CatalogItem]:
+        """The item for a product string, or None when nothing matches unambiguously."""
+        if product in self._memo:
+            return self._memo[product]
+        tokens = normalize_tokens(product)
+        item = self._exact.get(_token_key(tokens)) if tokens else None
+        if item is None and tokens:
+            item = self._fuzzy(tokens)
+        self._memo[product] = item
+        return item
+
+    def unmatched(self, products: Iterable[str]) -> List[str]:
+        """Distinct products without a match, in first-seen order."""
+        return [p for p in dict.fromkeys(products) if self.lookup(p) is None]
+
+
+def catalog_path() -> str:
+    path = Config.NS_ITEM_CATALOG
+    if not path or os.path.isabs(path):
+        return path
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), path)
+
+
+_catalog: Optional[ItemCatalog] = None
+_catalog_loaded = False
+
+
+def get_catalog() -> Optional[ItemCatalog]:
+    """The catalog from NS_ITEM_CATALOG, loaded on first use; None when not configured."""
+    global _catalog, _catalog_loaded
+    if not _catalog_loaded:
+        _catalog_loaded = True
+        path = catalog_path()
+        if path:
+            if not os.path.exists(path):
+                print(f"Item catalog not found: {path}")
+            else:
+                _catalog = ItemCatalog.from_csv(path)
+    return _catalog
+
+
+def match_item(product: str) -> Optional[CatalogItem]:
+    catalog = get_catalog()
+    return catalog.lookup(product) if catalog is not None else None
+
+
+def _iter_products(paths: Iterable[str]) -> Iterable[str]:
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            if path.endswith(".jsonl"):
+                entries = (json.loads(line) for line in f if line.strip())
+            else:
+                entries = [json.load(f)]
+            for entry in entries:
+                product = entry.get("Product") or entry.get("product")
+                if product:
+                    yield product
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check how exported products match the NetSuite item catalog.")
+    parser.add_argument("paths", nargs="+", help="Entry .json/.jsonl files")
+    parser.add_argument("--catalog", default="", help="NetSuite item export CSV (default: NS_ITEM_CATALOG)")
+    args = parser.parse_args()
+
+    path = args.catalog or catalog_path()
+    if not path or not os.path.exists(path):
+        print(f"Item catalog not found: {path or '(NS_ITEM_CATALOG not set)'}")
+        return 2
+    try:
+        catalog = ItemCatalog.from_csv(path)
+    except ValueError as e:
+        print(e)
+        return 2
+    missing = [p for p in args.paths if not os.path.exists(p)]
+    if missing:
+        print(f"File not found: {missing[0]}")
+        return 2
+
+    products = list(dict.fromkeys(_iter_products(args.paths)))
+    unmatched = catalog.unmatched(products)
+    print(f"{len(catalog)} catalog items, {len(products)} distinct products, {len(unmatched)} unmatched")
+    for product in products:
+        item = catalog.lookup(product)
+        print(f"- {product} -> {item.internal_id} {item.name}" if item else f"- {product} -> NO MATCH")
+    return 1 if unmatched else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
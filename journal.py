@@ -0,0 +1,120 @@
+"""
+Append-only checkpoint journal for long batch runs.
+
+- One JSON line per event in JOURNAL_FILE (default .run_journal.jsonl next
+  to the scripts), flushed and fsync'd before the run moves on, so a crash
+  loses at most the entry that was in flight
+- Every line carries the job (export, create_so, rest), a run id, the entry
+  id and the stage it completed: parsed, mapped, submitted; parsed lines
+  keep the record and submitted lines the order id
+- A run starts with a "start" line holding its inputs; --resume reopens the
+  job's last run, reuses those inputs when none are given, and skips every
+  entry whose work is already journaled (parsed records are replayed instead
+  of scraped again)
+- A half-written last line from a crash is ignored on replay
+
+Set JOURNAL_FILE to an empty value to turn journaling (and --resume) off.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Set
+
+from config import Config
+
+
+START = "start"
+PARSED = "parsed"
+MAPPED = "mapped"
+SUBMITTED = "submitted"
+
+
+def journal_path() -> str:
+    path = Config.JOURNAL_FILE
+    if not path or os.path.isabs(path):
+        return path
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), path)
+
+
+def read_journal(path: str) -> List[Dict]:
+    events: List[Dict] = []
+    if not os.path.exists(path):
+        return events
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                continue  # torn write from a crash
+    return events
+
+
+class Journal:
+    def __init__(self, job: str, run_id: str, path: str, events: Optional[List[Dict]] = None):
+        self.job = job
+        self.run_id = run_id
+        self.path = path
+        self.args: Dict = {}
+        self._stages: Dict[str, Dict[str, Dict]] = {}
+        for event in events or []:
+            if event.get("stage") == START:
+                self.args = event.get("args") or {}
+            elif event.get("entry_id"):
+                self._stages.setdefault(event["stage"], {})[str(event["entry_id"])] = event
+        self._lock = threading.Lock()
+        self._file = open(path, "a", encoding="utf-8")
+
+    def __enter__(self) -> "Journal":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def _append(self, event: Dict) -> None:
+        line = json.dumps(dict(event, job=self.job, run=self.run_id, at=time.strftime("%Y-%m-%d %H:%M:%S")), ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def start(self, args: Dict) -> None:
+        self.args = args
+        self._append({"stage": START, "args": args})
+
+    def record(self, entry_id: str, stage: str, **data) -> None:
+        event = {"entry_id": str(entry_id), "stage": stage, **data}
+        self._append(event)
+        self._stages.setdefault(stage, {})[str(entry_id)] = event
+
+    def done(self, stage: str) -> Set[str]:
+        """Entry ids that completed stage in this run (including before a resume)."""
+        return set(self._stages.get(stage, {}))
+
+    def get(self, stage: str, entry_id: str) -> Optional[Dict]:
+        return self._stages.get(stage, {}).get(str(entry_id))
+
+
+def open_journal(job: str, resume: bool = False, args: Optional[Dict] = None) -> Optional[Journal]:
+    """Start a new run of job, or reopen its last run with resume; None when JOURNAL_FILE is empty.
+
+    Raises ValueError when resume finds no earlier run of the job.
+    """
+    path = journal_path()
+    if not path:
+        if resume:
+            raise ValueError("JOURNAL_FILE is not set")
+        return None
+    if resume:
+        events = [e for e in read_journal(path) if e.get("job") == job]
+        if not events:
+            raise ValueError(f"No {job} run to resume in {path}")
+        run_id = events[-1].get("run", "")
+        return Journal(job, run_id, path, [e for e in events if e.get("run") == run_id])
+    journal = Journal(job, uuid.uuid4().hex[:12], path)
+    journal.start(args or {})
+    return journal
@@ -4,10 +4,13 @@ Selenium-based login agent for WordPress admin.
 - Reads credentials from environment variables via `config.Config`.
 - Navigates to the admin entries URL.
 - Waits for manual CAPTCHA solving if present.
+- LEAN_LOADING=True builds drivers that block images, fonts, analytics and
+  other configured URL patterns through the DevTools protocol.
 """
+import json
 import sys
 import time
-from typing import Optional
+from typing import Dict, List, Optional
 import getpass
 
 from selenium import webdriver
@@ -20,16 +23,77 @@ from selenium.common.exceptions import TimeoutException, NoSuchElementException
 # Using Selenium Manager; no external driver manager needed
 
 from config import Config
+from tracing import traced
 
 
-def build_driver(headless: bool) -> webdriver.Chrome:
+# URL patterns blocked for each resource type in the lean profile
+# (Network.setBlockedURLs only matches URLs, so types map to extensions)
+RESOURCE_TYPE_PATTERNS = {
+    "image": ["*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.svg*", "*.ico*"],
+    "font": ["*.woff*", "*.woff2*", "*.ttf*", "*.otf*", "*.eot*"],
+    "media": ["*.mp4*", "*.webm*", "*.mp3*", "*.ogg*"],
+    "stylesheet": ["*.css*"],
+}
+
+
+def lean_blocked_patterns() -> List[str]:
+    patterns = [p.strip() for p in Config.BLOCK_URL_PATTERNS.split(",") if p.strip()]
+    for resource_type in Config.BLOCK_RESOURCE_TYPES.split(","):
+        patterns.extend(RESOURCE_TYPE_PATTERNS.get(resource_type.strip().lower(), []))
+    return patterns
+
+
+def apply_lean_profile(driver: webdriver.Chrome) -> None:
+    """Block analytics/fonts/images etc. through the DevTools protocol."""
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": lean_blocked_patterns()})
+    except Exception:
+        # Not fatal: pages just load at full weight
+        pass
+
+
+def navigation_stats(driver: webdriver.Chrome) -> Dict[str, int]:
+    """Requests, blocked requests and bytes received since the previous call (lean profile only)."""
+    stats = {"requests": 0, "blocked": 0, "bytes": 0}
+    try:
+        logs = driver.get_log("performance")
+    except Exception:
+        return stats
+    for entry in logs:
+        try:
+            message = json.loads(entry["message"])["message"]
+        except (KeyError, ValueError):
+            continue
+        method = message.get("method")
+        params = message.get("params", {})
+        if method == "Network.requestWillBeSent":
+            stats["requests"] += 1
+        elif method == "Network.loadingFailed" and params.get("blockedReason"):
+            stats["blocked"] += 1
+        elif method == "Network.loadingFinished":
+            stats["bytes"] += int(params.get("encodedDataLength") or 0)
+    return stats
+
+
+@traced("chrome.start")
+def build_driver(headless: bool, lean: Optional[bool] = None) -> webdriver.Chrome:
+    lean = Config.LEAN_LOADING if lean is None else lean
     chrome_options = Options()
     if headless:
         chrome_options.add_argument("--headless=new")
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-dev-shm-usage")
     chrome_options.add_argument("--disable-gpu")
-    chrome_options.add_argument("--window-size=1400,1000")
+    if lean and headless:
+        # Nobody looks at a headless window; smaller viewport means less layout/paint
+        chrome_options.add_argument(f"--window-size={Config.LEAN_WINDOW_SIZE}")
+    else:
+        chrome_options.add_argument("--window-size=1400,1000")
+    if lean:
+        chrome_options.add_argument("--blink-settings=imagesEnabled=false")
+        chrome_options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+        chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
     chrome_options.add_argument("--disable-blink-features=AutomationControlled")
     chrome_options.add_argument("--remote-allow-origins=*")
     chrome_options.add_argument("--disable-features=Translate,AutomationControlled,IsolateOrigins,site-per-process")
@@ -41,6 +105,8 @@ def build_driver(headless: bool) -> webdriver.Chrome:
     driver = webdriver.Chrome(options=chrome_options)
     driver.set_page_load_timeout(max(Config.PAGE_LOAD_TIMEOUT, 60))
     driver.set_script_timeout(max(Config.PAGE_LOAD_TIMEOUT, 60))
+    if lean:
+        apply_lean_profile(driver)
     return driver
 
 
@@ -51,13 +117,8 @@ def wait_for_element(driver: webdriver.Chrome, by: By, value: str, timeout: int)
         return None
 
 
-def perform_login(driver: webdriver.Chrome) -> None:
-    try:
-        driver.get(Config.WP_ADMIN_URL)
-    except TimeoutException:
-        # Continue even if initial navigation times out; page may still be interactive
-        pass
-
+@traced("wp.login.overlay", outcome=lambda clicked: "clicked" if clicked else "absent")
+def dismiss_login_overlay(driver: webdriver.Chrome) -> bool:
     # If GoDaddy overlay shows, click the fallback link to show WP username/password form
     try:
         # Try several selectors for the link/button
@@ -75,9 +136,21 @@ def perform_login(driver: webdriver.Chrome) -> None:
                 except TimeoutException:
                     pass
                 elems[0].click()
-                break
+                return True
     except Exception:
         pass
+    return False
+
+
+@traced("wp.login")
+def perform_login(driver: webdriver.Chrome) -> None:
+    try:
+        driver.get(Config.WP_ADMIN_URL)
+    except TimeoutException:
+        # Continue even if initial navigation times out; page may still be interactive
+        pass
+
+    dismiss_login_overlay(driver)
 
     # WordPress login form fields (visible and interactable)
     try:
@@ -3,15 +3,54 @@ Map exported entry JSON to a minimal NetSuite Sales Order CSV.
 
 Columns (example):
 - Entity: customer identifier (email or name)
-- Item: product name
+- Item: product name (the catalog item's name when matched)
+- Item Internal ID: only with an item catalog (NS_ITEM_CATALOG); the
+  matched item's internal id, empty when the product has no match
 - Quantity: numeric quantity
 - Memo: concatenated details (site, employee id, phone, etc.)
+- External ID: only with --consolidate; rows sharing it are imported as one
+  multi-line Sales Order
+
+Batch mode (--batch, several paths, .jsonl input or - for stdin) streams any
+number of entries through map_to_so_rows into one <prefix>.csv; only when
+there are more than NS_CSV_MAX_ROWS rows is it split into
+<prefix>_partNNN.csv files, to stay inside NetSuite's CSV Import limits.
+Memory use does not grow with the number of entries.
+
+--consolidate HOURS (or NS_CONSOLIDATE_HOURS) groups the entries of one
+customer and Site Number submitted within HOURS into one order
+(consolidate.py): their rows share an External ID and a memo listing every
+Entry ID, and are never split across part files. Grouping holds all rows in
+memory.
+
+With --store, every exported entry in the SQLite entry store is mapped the
+same way; rows are also saved back to the store (status -> mapped).
 """
+import argparse
 import csv
 import json
 import os
 import sys
 from datetime import datetime
+from typing import Iterable, Iterator, Optional
+
+from config import Config
+from consolidate import consolidate_rows
+from item_catalog import get_catalog, match_item
+from tracing import traced
+
+
+SO_CSV_FIELDS = ["Entity", "Item", "Quantity", "Memo"]
+
+
+def so_csv_fields(consolidated: bool = False) -> list[str]:
+    """SO_CSV_FIELDS plus Item Internal ID with a catalog and External ID when consolidating."""
+    fields = list(SO_CSV_FIELDS)
+    if get_catalog() is not None:
+        fields.insert(fields.index("Item") + 1, "Item Internal ID")
+    if consolidated:
+        fields.insert(0, "External ID")
+    return fields
 
 
 def load_entry_json(path: str) -> dict:
@@ -54,43 +93,212 @@ def map_to_so_rows(entry: dict) -> list[dict]:
     except Exception:
         qty_str = "1"
 
+    item = match_item(product)
+
     return [{
         "Entity": entity,
-        "Item": product,
+        "Item": item.name if item else product,
+        "Item Internal ID": item.internal_id if item else "",
         "Quantity": qty_str,
         "Memo": memo,
     }]
 
 
-def write_csv(rows: list[dict], out_path: str) -> None:
-    fieldnames = ["Entity", "Item", "Quantity", "Memo"]
+@traced("write.so_csv")
+def write_csv(rows: list[dict], out_path: str, fieldnames: Optional[list[str]] = None) -> None:
     with open(out_path, "w", newline="", encoding="utf-8") as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer = csv.DictWriter(f, fieldnames=fieldnames or so_csv_fields(), extrasaction="ignore")
         writer.writeheader()
         for row in rows:
             writer.writerow(row)
 
 
+def iter_entries_from_jsonl(stream: Iterable[str]) -> Iterator[dict]:
+    for line in stream:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def iter_entries_from_paths(paths: Iterable[str]) -> Iterator[dict]:
+    """Stream entries from .json files (one entry each), .jsonl files, or "-" for stdin JSON lines."""
+    for path in paths:
+        if path == "-":
+            yield from iter_entries_from_jsonl(sys.stdin)
+        elif path.endswith(".jsonl"):
+            with open(path, "r", encoding="utf-8") as f:
+                yield from iter_entries_from_jsonl(f)
+        else:
+            yield load_entry_json(path)
+
+
+def iter_so_rows(entries: Iterable[dict]) -> Iterator[dict]:
+    for entry in entries:
+        yield from map_to_so_rows(entry)
+
+
+def track_unmatched(rows: Iterable[dict], unmatched: dict) -> Iterator[dict]:
+    """Pass rows through, counting items the catalog has no internal id for."""
+    for row in rows:
+        if not row["Item Internal ID"]:
+            unmatched[row["Item"]] = unmatched.get(row["Item"], 0) + 1
+        yield row
+
+
+def report_unmatched(unmatched: dict) -> None:
+    if not unmatched or get_catalog() is None:
+        return
+    print(f"{len(unmatched)} products not in the item catalog (NS_ITEM_CATALOG):", file=sys.stderr)
+    for product, count in sorted(unmatched.items(), key=lambda kv: -kv[1]):
+        print(f"- {product} ({count} rows)", file=sys.stderr)
+
+
+@traced("write.so_csv_chunks")
+def write_csv_chunks(rows: Iterable[dict], out_prefix: str, max_rows: int = 0,
+                     fieldnames: Optional[list[str]] = None) -> list[str]:
+    """Stream rows into <prefix>.csv; past max_rows rows, into <prefix>_partNNN.csv files of at most max_rows rows."""
+    fieldnames = fieldnames or so_csv_fields()
+    paths: list[str] = []
+    f = None
+    writer = None
+    count = 0
+    previous_id = ""
+    try:
+        for row in rows:
+            # Rows of one consolidated order stay in the same file
+            same_order = bool(previous_id) and row.get("External ID") == previous_id
+            previous_id = row.get("External ID", "")
+            if writer is None or (max_rows and count >= max_rows and not same_order):
+                if f is None:
+                    path = f"{out_prefix}.csv"
+                else:
+                    f.close()
+                    if len(paths) == 1:
+                        # The output does not fit one file after all: it becomes part 1
+                        os.replace(paths[0], f"{out_prefix}_part001.csv")
+                        paths[0] = f"{out_prefix}_part001.csv"
+                    path = f"{out_prefix}_part{len(paths) + 1:03d}.csv"
+                f = open(path, "w", newline="", encoding="utf-8")
+                writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction="ignore")
+                writer.writeheader()
+                paths.append(path)
+                count = 0
+            writer.writerow(row)
+            count += 1
+    finally:
+        if f is not None:
+            f.close()
+    return paths
+
+
+def iter_consolidated_rows(entries: Iterable[dict], form_id: str, hours: float) -> Iterator[dict]:
+    pairs = [(entry, map_to_so_rows(entry)) for entry in entries]
+    for _, rows in consolidate_rows(pairs, form_id, hours):
+        yield from rows
+
+
+def map_store(store, out_prefix: str, status: str = "exported", max_rows: int = 0, unmatched: Optional[dict] = None,
+              hours: float = 0) -> tuple[int, list[str]]:
+    """Map every entry in the store with the given status; rows go to the store and to CSV.
+
+    Returns (entries_mapped, csv_paths).
+    """
+    mapped: dict[str, list[str]] = {}
+
+    def _pairs() -> Iterator[tuple]:
+        if hours <= 0:
+            for form_id, entry_id, entry in store.iter_entries_with_form(status=status):
+                yield form_id, entry_id, map_to_so_rows(entry)
+            return
+        by_form: dict[str, list[tuple]] = {}
+        for form_id, entry_id, entry in store.iter_entries_with_form(status=status):
+            by_form.setdefault(form_id, []).append((dict(entry, **{"Entry Id": entry_id}), map_to_so_rows(entry)))
+        for form_id, pairs in by_form.items():
+            for entry, rows in consolidate_rows(pairs, form_id, hours):
+                yield form_id, entry["Entry Id"], rows
+
+    def _rows() -> Iterator[dict]:
+        for form_id, entry_id, rows in _pairs():
+            store.save_so_rows(form_id, entry_id, rows)
+            mapped.setdefault(form_id, []).append(entry_id)
+            yield from rows
+
+    rows = _rows() if unmatched is None else track_unmatched(_rows(), unmatched)
+    paths = write_csv_chunks(rows, out_prefix, max_rows, so_csv_fields(hours > 0))
+    for form_id, entry_ids in mapped.items():
+        store.set_status(form_id, entry_ids, "mapped")
+    return sum(len(ids) for ids in mapped.values()), paths
+
+
 def main() -> int:
-    if len(sys.argv) < 2:
-        print("Usage: python map_to_netsuite_so.py /path/to/entry_<id>_*.json")
-        return 2
-    in_path = sys.argv[1]
-    if not os.path.exists(in_path):
-        print(f"File not found: {in_path}")
+    parser = argparse.ArgumentParser(description="Map exported entries to NetSuite Sales Order CSV.")
+    parser.add_argument("paths", nargs="*", help="Entry .json/.jsonl files, or - for JSON lines on stdin")
+    parser.add_argument("--batch", action="store_true", help="Consolidate all inputs into one (chunked) CSV")
+    parser.add_argument("--store", nargs="?", const="", default=None, metavar="DB",
+                        help="Map exported entries from the SQLite entry store (default: ENTRY_STORE)")
+    parser.add_argument("--max-rows", type=int, default=None,
+                        help=f"Split output CSVs at this many rows (default: NS_CSV_MAX_ROWS={Config.NS_CSV_MAX_ROWS}; 0 = no split)")
+    parser.add_argument("--out", default="", help="Output path prefix (default: netsuite_sales_orders_<timestamp>)")
+    parser.add_argument("--consolidate", type=float, default=None, metavar="HOURS",
+                        help=f"One order per customer and site within HOURS (default: NS_CONSOLIDATE_HOURS={Config.NS_CONSOLIDATE_HOURS:g}; 0 = off)")
+    args = parser.parse_args()
+    max_rows = Config.NS_CSV_MAX_ROWS if args.max_rows is None else args.max_rows
+    hours = Config.NS_CONSOLIDATE_HOURS if args.consolidate is None else args.consolidate
+    unmatched: dict = {}
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+
+    if args.store is not None:
+        # Imported here so file-based mapping has no extra dependencies
+        from entry_store import EntryStore
+        try:
+            store = EntryStore(args.store)
+        except ValueError as e:
+            print(f"{e}; pass the database path or set ENTRY_STORE.")
+            return 2
+        with store:
+            out_dir = os.path.dirname(os.path.abspath(store.path))
+            out_prefix = args.out or os.path.join(out_dir, f"netsuite_sales_orders_{ts}")
+            count, paths = map_store(store, out_prefix, max_rows=max_rows, unmatched=unmatched, hours=hours)
+        print(f"Mapped {count} entries")
+        for path in paths:
+            print(path)
+        report_unmatched(unmatched)
+        return 0
+
+    if not args.paths:
+        parser.print_usage()
         return 2
+    for path in args.paths:
+        if path != "-" and not os.path.exists(path):
+            print(f"File not found: {path}")
+            return 2
+
+    if args.batch or len(args.paths) > 1 or args.paths[0] == "-" or args.paths[0].endswith(".jsonl"):
+        out_dir = os.path.dirname(os.path.abspath(args.paths[0] if args.paths[0] != "-" else "."))
+        out_prefix = args.out or os.path.join(out_dir, f"netsuite_sales_orders_{ts}")
+        if hours > 0:
+            # Imported here so plain mapping has no extra dependencies
+            from export_first_entry import get_form_id_from_admin_url
+            so_rows = iter_consolidated_rows(iter_entries_from_paths(args.paths), get_form_id_from_admin_url(Config.WP_ADMIN_URL), hours)
+        else:
+            so_rows = iter_so_rows(iter_entries_from_paths(args.paths))
+        rows = track_unmatched(so_rows, unmatched)
+        for path in write_csv_chunks(rows, out_prefix, max_rows, so_csv_fields(hours > 0)):
+            print(path)
+        report_unmatched(unmatched)
+        return 0
+
+    in_path = args.paths[0]
     entry = load_entry_json(in_path)
     rows = map_to_so_rows(entry)
-    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
     entry_id = entry.get("Entry Id") or "unknown"
     out_dir = os.path.dirname(os.path.abspath(in_path))
     out_path = os.path.join(out_dir, f"netsuite_sales_order_{entry_id}_{ts}.csv")
-    write_csv(rows, out_path)
+    write_csv(list(track_unmatched(rows, unmatched)), out_path)
     print(out_path)
+    report_unmatched(unmatched)
     return 0
 
 
 if __name__ == "__main__":
     raise SystemExit(main())
-
-
@@ -1,31 +1,56 @@
 """
-Create a NetSuite Sales Order from an exported entry JSON.
+Create NetSuite Sales Orders from exported entry JSON files.
 
 Behavior:
-- Logs in to NetSuite using NS_USERNAME/NS_PASSWORD/NS_LOGIN_URL env vars (visible browser)
-- Navigates to Sales Order creation page
-- Attempts to populate Entity, Item, Quantity, and Memo
-- Leaves browser open for manual verification and Save
+- Logs in to NetSuite once using NS_USERNAME/NS_PASSWORD/NS_LOGIN_URL env vars (visible browser)
+- For each entry: navigates to the Sales Order creation page and attempts
+  to populate Entity, Item, Quantity, and Memo
+- Waits (up to NS_SAVE_TIMEOUT) until the page shows the saved order, then
+  moves on; --auto-save clicks Save itself
+
+Products are matched against the item catalog (NS_ITEM_CATALOG) first; the
+catalog name is typed into the item field and products without a match are
+listed before NetSuite is opened. With NS_CONSOLIDATE_HOURS (or
+--consolidate HOURS), entries of the same customer and site become one
+multi-line order (consolidate.py). Mapped and saved orders are checkpointed
+in the run journal (JOURNAL_FILE); --resume continues the last run with its
+arguments and skips entries it already saved.
+
+Arguments can also be bare entry ids, which are read from the entry store
+when ENTRY_STORE is set. Entries the dedup index already has an order for
+are skipped unless --force is given. With BROWSER_DAEMON_URL set, the forms are filled
+in the browser daemon's NetSuite session instead of a new browser.
 
 Notes:
 - NetSuite UIs vary by account/role. This script tries common selectors, then shows values for manual paste if needed.
 """
+import argparse
 import os
-import sys
+import re
 import json
-import time
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
 
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
+from config import Config
+from consolidate import consolidate_orders, order_entry_ids, order_lines
+from daemon_client import daemon_request
+from dedup_index import CHANGED, UNCHANGED, content_hash, open_index
+from entry_store import EntryStore
+from export_first_entry import get_form_id_from_admin_url
+from item_catalog import get_catalog, match_item
+from journal import MAPPED, SUBMITTED, Journal, open_journal
 from login_agent import build_driver
 from netsuite_login import perform_netsuite_login
+from tracing import span, traced
 
 
 NS_SO_URL = "https://system.netsuite.com/app/accounting/transactions/salesord.nl?whence="
+# Seconds to wait for the Sales Order form to render
+FORM_WAIT = 60
 
 
 def load_entry(path: str) -> Dict[str, str]:
@@ -55,12 +80,21 @@ def map_entry(entry: Dict[str, str]) -> Dict[str, str]:
     if site_number:
         memo_parts.append(f"Site: {site_number}")
     memo = " | ".join(memo_parts)
+    item = match_item(product)
 
     return {
         "entity": entity,
         "item": product,
+        "item_id": item.internal_id if item else "",
+        "item_name": item.name if item else "",
         "quantity": quantity,
         "memo": memo,
+        "entry_id": entry_id,
+        "email": email,
+        "first_name": first_name,
+        "last_name": last_name,
+        "site_number": site_number,
+        "submitted_on": entry.get("Submitted on") or "",
     }
 
 
@@ -72,10 +106,11 @@ def safe_type(el, text: str) -> None:
     el.send_keys(text)
 
 
+@traced("ns.fill")
 def try_fill_sales_order(driver, mapped: Dict[str, str]) -> None:
     # Wait for SO form
     try:
-        WebDriverWait(driver, 60).until(
+        WebDriverWait(driver, FORM_WAIT).until(
             EC.any_of(
                 EC.presence_of_element_located((By.ID, "main_form")),
                 EC.presence_of_element_located((By.CSS_SELECTOR, "form#main_form, form[name='main_form']")),
@@ -84,8 +119,8 @@ def try_fill_sales_order(driver, mapped: Dict[str, str]) -> None:
     except TimeoutException:
         pass
 
-    # Entity field
-    for locator in [
+    # Entity field (already set through the URL when it is an internal id)
+    for locator in [] if mapped["entity"].isdigit() else [
         (By.ID, "entityname"),
         (By.CSS_SELECTOR, "input[name='entity_display']"),
         (By.CSS_SELECTOR, "input#entityname_display, input#entityname, input[name='entityname']"),
@@ -105,6 +140,12 @@ def try_fill_sales_order(driver, mapped: Dict[str, str]) -> None:
             safe_type(els[0], mapped["memo"]) 
             break
 
+    # One sublist line per item (several for a consolidated order)
+    for line in order_lines(mapped):
+        fill_item_line(driver, line)
+
+
+def fill_item_line(driver, line: Dict[str, str]) -> None:
     # Add item row
     # Click "Add" on item sublist if present
     try:
@@ -127,7 +168,8 @@ def try_fill_sales_order(driver, mapped: Dict[str, str]) -> None:
             item_field = els[0]
             break
     if item_field:
-        safe_type(item_field, mapped["item"]) 
+        # The catalog name autocompletes to exactly one item
+        safe_type(item_field, line.get("item_name") or line["item"])
 
     # Quantity field
     qty_field = None
@@ -141,7 +183,7 @@ def try_fill_sales_order(driver, mapped: Dict[str, str]) -> None:
             qty_field = els[0]
             break
     if qty_field:
-        safe_type(qty_field, mapped["quantity"]) 
+        safe_type(qty_field, line["quantity"])
 
     if add_btn:
         try:
@@ -150,16 +192,236 @@ def try_fill_sales_order(driver, mapped: Dict[str, str]) -> None:
             pass
 
 
+SAVED_URL_RE = r"salesord\.nl\?(?:.*&)?id=(\d+)"
+
+
+def click_save(driver) -> bool:
+    for locator in [
+        (By.ID, "btn_multibutton_submitter"),
+        (By.ID, "submitter"),
+        (By.CSS_SELECTOR, "input[name='submitter'], button[name='submitter']"),
+    ]:
+        els = driver.find_elements(*locator)
+        if els:
+            try:
+                els[0].click()
+                return True
+            except Exception:
+                continue
+    return False
+
+
+@traced("ns.save", outcome=lambda so_id: "ok" if so_id else "timeout")
+def wait_for_save(driver, timeout: int) -> str:
+    """Wait until NetSuite shows the saved Sales Order; return its internal id ("" on timeout)."""
+    try:
+        WebDriverWait(driver, timeout).until(
+            EC.any_of(
+                EC.url_matches(SAVED_URL_RE),
+                EC.presence_of_element_located((By.CSS_SELECTOR, ".uir-alert-box.confirmation")),
+            )
+        )
+    except TimeoutException:
+        return ""
+    m = re.search(SAVED_URL_RE, driver.current_url or "")
+    return m.group(1) if m else "saved"
+
+
+def resolve_entry_arg(arg: str) -> Optional[Dict[str, str]]:
+    """Load an entry from a JSON path, or by entry id from the entry store."""
+    if not os.path.exists(arg) and arg.isdigit() and Config.ENTRY_STORE:
+        with EntryStore() as store:
+            entry = store.get(get_form_id_from_admin_url(Config.WP_ADMIN_URL), arg)
+        if entry is None:
+            print(f"Entry {arg} not found in: {Config.ENTRY_STORE}")
+        return entry
+    if not os.path.exists(arg):
+        print(f"File not found: {arg}")
+        return None
+    return load_entry(arg)
+
+
+def create_order_timeout() -> int:
+    """Worst case of create_order: page load, form wait and the save wait, plus slack for the item lines."""
+    page_load = max(Config.PAGE_LOAD_TIMEOUT, 60)
+    return page_load + FORM_WAIT + max(Config.NS_SAVE_TIMEOUT, Config.PAGE_LOAD_TIMEOUT) + 60
+
+
+def create_order(driver, mapped: Dict[str, str], auto_save: bool) -> str:
+    with span("ns.create_order", entry_id=mapped.get("entry_id", "")) as s:
+        # Navigate directly to Sales Order page (NetSuite will route per role)
+        url = NS_SO_URL
+        if mapped["entity"].isdigit():
+            # Resolved customer: NetSuite fills the customer field itself
+            url += f"&entity={mapped['entity']}"
+        with span("ns.open_form"):
+            try:
+                driver.get(url)
+            except TimeoutException:
+                pass
+
+        try_fill_sales_order(driver, mapped)
+
+        print("Filled values (paste if needed):")
+        print(f"- Entity: {mapped['entity']}")
+        for line in order_lines(mapped):
+            print(f"- Item: {line.get('item_name') or line['item']}")
+            print(f"- Quantity: {line['quantity']}")
+        print(f"- Memo: {mapped['memo']}")
+        if auto_save and click_save(driver):
+            so_id = wait_for_save(driver, Config.PAGE_LOAD_TIMEOUT)
+        else:
+            print(f"Waiting up to {Config.NS_SAVE_TIMEOUT} seconds. Please review and click Save in NetSuite.")
+            so_id = wait_for_save(driver, Config.NS_SAVE_TIMEOUT)
+        s.tag(outcome="ok" if so_id else "timeout")
+        return so_id
+
+
+def mark_submitted(mapped: Dict[str, str], so_id: str, hashes: Optional[Dict[str, str]] = None, journal: Optional[Journal] = None) -> None:
+    """Record the order for every source entry (several for a consolidated order)."""
+    form_id = get_form_id_from_admin_url(Config.WP_ADMIN_URL)
+    entry_ids = order_entry_ids(mapped)
+    if journal is not None:
+        for entry_id in entry_ids:
+            journal.record(entry_id, SUBMITTED, order_id=so_id)
+    if Config.ENTRY_STORE and entry_ids:
+        with EntryStore() as store:
+            store.set_status(form_id, entry_ids, "submitted")
+    hashed = [(entry_id, hashes[entry_id]) for entry_id in entry_ids if hashes and hashes.get(entry_id)]
+    if hashed:
+        index = open_index()
+        if index is not None:
+            with index:
+                for entry_id, digest in hashed:
+                    index.record_order(form_id, entry_id, digest, so_id)
+
+
+def already_ordered(entry: Dict[str, str], entry_id: str, force: bool) -> Tuple[bool, str]:
+    """Check the dedup index; return (skip, content hash)."""
+    index = open_index()
+    if index is None or not entry_id:
+        return False, ""
+    digest = content_hash(entry)
+    with index:
+        state, order_id = index.check(get_form_id_from_admin_url(Config.WP_ADMIN_URL), entry_id, digest)
+    if state == UNCHANGED and not force:
+        print(f"Entry {entry_id}: unchanged, already Sales Order {order_id}; skipped")
+        return True, digest
+    if state == CHANGED and not force:
+        print(f"Entry {entry_id}: changed since Sales Order {order_id}; skipped (use --force to submit again)")
+        return True, digest
+    return False, digest
+
+
+def resolve_customers(mapped_orders: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """Swap customer emails/names for internal ids (API lookup when credentials exist, else cache only)."""
+    # Imported here: both modules build on map_entry from this module
+    from customer_cache import CustomerResolver
+    from netsuite_rest import NetSuiteClient, has_api_credentials
+
+    client = NetSuiteClient() if has_api_credentials() else None
+    resolver = CustomerResolver(client)
+    try:
+        resolver.prefetch(mapped_orders)
+        return [resolver.apply(mapped) for mapped in mapped_orders]
+    finally:
+        resolver.close()
+        if client is not None:
+            client.close()
+
+
 def main() -> int:
-    if len(sys.argv) < 2:
-        print("Usage: python netsuite_create_so.py /path/to/entry_<id>_...json")
-        return 2
-    entry_json = sys.argv[1]
-    if not os.path.exists(entry_json):
-        print(f"File not found: {entry_json}")
+    parser = argparse.ArgumentParser(description="Create NetSuite Sales Orders by filling the form in a browser.")
+    parser.add_argument("entries", nargs="*", help="Entry JSON files, or entry ids read from the entry store")
+    parser.add_argument("--auto-save", action="store_true", help="Click Save instead of waiting for it")
+    parser.add_argument("--force", action="store_true", help="Submit entries the dedup index already has an order for")
+    parser.add_argument("--consolidate", type=float, default=None, metavar="HOURS",
+                        help=f"One order per customer and site within HOURS (default: NS_CONSOLIDATE_HOURS={Config.NS_CONSOLIDATE_HOURS:g}; 0 = off)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue the last run from the journal (JOURNAL_FILE), skipping entries it already saved")
+    parsed = parser.parse_args()
+    args = parsed.entries
+    auto_save = parsed.auto_save
+    force = parsed.force
+    hours = parsed.consolidate
+    journal = None
+    if parsed.resume:
+        try:
+            journal = open_journal("create_so", resume=True)
+        except ValueError as e:
+            print(e)
+            return 2
+        args = args or journal.args.get("args") or []
+        hours = journal.args.get("hours") if hours is None else hours
+    if not args:
+        parser.print_usage()
+        print("Provide entry JSON paths or entry ids (or --resume).")
         return 2
-    entry = load_entry(entry_json)
-    mapped = map_entry(entry)
+    if journal is None:
+        journal = open_journal("create_so", args={"args": args, "hours": hours})
+    try:
+        return create_orders(args, auto_save, force, hours, journal)
+    finally:
+        if journal is not None:
+            journal.close()
+
+
+def create_orders(args: List[str], auto_save: bool, force: bool, hours: Optional[float], journal: Optional[Journal]) -> int:
+    submitted = journal.done(SUBMITTED) if journal is not None else set()
+    mapped_orders = []
+    hashes: Dict[str, str] = {}
+    for arg in args:
+        entry = resolve_entry_arg(arg)
+        if entry is None:
+            return 2
+        mapped = map_entry(entry)
+        if mapped["entry_id"] in submitted:
+            print(f"Entry {mapped['entry_id']}: submitted earlier in this run; skipped")
+            continue
+        skip, digest = already_ordered(entry, mapped["entry_id"], force)
+        if skip:
+            continue
+        hashes[mapped["entry_id"]] = digest
+        mapped_orders.append(mapped)
+    if not mapped_orders:
+        print("Nothing to submit.")
+        return 0
+    mapped_orders = consolidate_orders(mapped_orders, get_form_id_from_admin_url(Config.WP_ADMIN_URL), hours)
+    if get_catalog() is not None:
+        unmatched = get_catalog().unmatched(line["item"] for m in mapped_orders for line in order_lines(m) if not line["item_id"])
+        if unmatched:
+            print(f"Not in the item catalog (pick the item by hand): {', '.join(unmatched)}")
+    mapped_orders = resolve_customers(mapped_orders)
+    if journal is not None:
+        for mapped in mapped_orders:
+            for entry_id in order_entry_ids(mapped):
+                journal.record(entry_id, MAPPED)
+
+    # A running browser daemon keeps NetSuite logged in between runs
+    if Config.BROWSER_DAEMON_URL:
+        saved = 0
+        for n, mapped in enumerate(mapped_orders, 1):
+            print(f"[{n}/{len(mapped_orders)}] Entry {', '.join(order_entry_ids(mapped)) or '?'}")
+            reply = daemon_request("fill-so", {"order": mapped, "auto_save": auto_save},
+                                   timeout=create_order_timeout())
+            if reply is not None and reply.get("no_reply"):
+                # The daemon may still be saving this order: filling it again could save it twice
+                print(f"{reply['error']}; check NetSuite for this order before running again.")
+                return 1
+            if reply is None:
+                if n == 1:
+                    break  # daemon not running; fill the forms here instead
+                print("Browser daemon went away.")
+                return 1
+            if reply.get("so_id"):
+                saved += 1
+                print(f"Saved Sales Order {reply['so_id']}")
+                mark_submitted(mapped, reply["so_id"], hashes, journal)
+            else:
+                print(reply.get("error") or "Sales Order was not saved in time; moving on.")
+        else:
+            print(f"Saved {saved}/{len(mapped_orders)} Sales Orders")
+            return 0 if saved == len(mapped_orders) else 1
 
     username = os.getenv("NS_USERNAME", "")
     password = os.getenv("NS_PASSWORD", "")
@@ -171,24 +433,21 @@ def main() -> int:
     # Visible browser for manual assistance
     os.environ["HEADLESS_MODE"] = "False"
     driver = build_driver(headless=False)
+    saved = 0
     try:
+        # Login (and any 2FA) happens once for the whole batch
         perform_netsuite_login(driver, login_url, username, password)
-        # Navigate directly to Sales Order page (NetSuite will route per role)
-        try:
-            driver.get(NS_SO_URL)
-        except TimeoutException:
-            pass
-
-        try_fill_sales_order(driver, mapped)
-
-        print("Filled values (paste if needed):")
-        print(f"- Entity: {mapped['entity']}")
-        print(f"- Item: {mapped['item']}")
-        print(f"- Quantity: {mapped['quantity']}")
-        print(f"- Memo: {mapped['memo']}")
-        print("Leaving browser open for 90 seconds. Please review and click Save in NetSuite.")
-        time.sleep(90)
-        return 0
+        for n, mapped in enumerate(mapped_orders, 1):
+            print(f"[{n}/{len(mapped_orders)}] Entry {', '.join(order_entry_ids(mapped)) or '?'}")
+            so_id = create_order(driver, mapped, auto_save)
+            if so_id:
+                saved += 1
+                print(f"Saved Sales Order {so_id}")
+                mark_submitted(mapped, so_id, hashes, journal)
+            else:
+                print("Sales Order was not saved in time; moving on.")
+        print(f"Saved {saved}/{len(mapped_orders)} Sales Orders")
+        return 0 if saved == len(mapped_orders) else 1
     finally:
         try:
             driver.quit()
@@ -198,5 +457,3 @@ def main() -> int:
 
 if __name__ == "__main__":
     raise SystemExit(main())
-
-
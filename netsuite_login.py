@@ -16,6 +16,7 @@ from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 
 from login_agent import build_driver
+from tracing import traced
 
 
 def wait_present(driver, locator: tuple, timeout: int) -> Optional[object]:
@@ -32,6 +33,7 @@ def wait_clickable(driver, locator: tuple, timeout: int) -> Optional[object]:
         return None
 
 
+@traced("ns.login")
 def perform_netsuite_login(driver, login_url: str, username: str, password: str) -> None:
     try:
         driver.get(login_url)
@@ -0,0 +1,371 @@
+"""
+Create NetSuite Sales Orders through the REST record API (no browser).
+
+- POST {NS_REST_BASE_URL}/services/rest/record/v1/salesOrder per order, body
+  built from netsuite_create_so.map_entry
+- Auth: token-based authentication (OAuth 1.0, HMAC-SHA256) with
+  NS_CONSUMER_KEY/NS_CONSUMER_SECRET/NS_TOKEN_ID/NS_TOKEN_SECRET, or an
+  OAuth 2.0 bearer token in NS_ACCESS_TOKEN
+- Orders are submitted in batches of NS_BATCH_SIZE, NS_SUBMIT_WORKERS at a
+  time, over one pooled keep-alive session; every order gets a result
+  (entry id, ok, internal id, HTTP status, error)
+- Customers are resolved to internal ids in bulk per batch through
+  customer_cache (cached on disk, created when missing); items come from the
+  item catalog (NS_ITEM_CATALOG); an order whose customer or item has no
+  internal id fails before any request
+- --consolidate HOURS (or NS_CONSOLIDATE_HOURS) merges the entries of one
+  customer and site into multi-line orders (consolidate.py)
+- Each order carries externalId gf-<form>-<entry> (plus a digest of all
+  entry ids for a merged order) so NetSuite itself rejects a second order
+  for the same entries; entries the dedup index (DEDUP_INDEX) already has an
+  order for are skipped before any request is made
+- Created orders are checkpointed in the run journal (JOURNAL_FILE);
+  --resume continues the last run with its inputs, skipping the entries it
+  already submitted
+
+NS_REST_BASE_URL defaults to https://<NS_ACCOUNT_ID>.suitetalk.api.netsuite.com
+and can point at a local mock endpoint. The Selenium form fill in
+netsuite_create_so.py remains the fallback when no API credentials exist.
+"""
+import argparse
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import Config
+from consolidate import consolidate_orders, external_id, order_entry_ids, order_lines
+from dedup_index import CHANGED, UNCHANGED, DedupIndex, content_hash, open_index
+from export_first_entry import get_form_id_from_admin_url
+from item_catalog import get_catalog
+from journal import SUBMITTED, Journal, open_journal
+from netsuite_create_so import load_entry, map_entry
+from tracing import span
+
+
+SALES_ORDER_PATH = "/services/rest/record/v1/salesOrder"
+
+
+def _quote(value: str) -> str:
+    return urllib.parse.quote(str(value), safe="~")
+
+
+def api_base_url() -> str:
+    """Raises ValueError when neither NS_REST_BASE_URL nor NS_ACCOUNT_ID is set."""
+    if Config.NS_REST_BASE_URL:
+        return Config.NS_REST_BASE_URL.rstrip("/")
+    if not Config.NS_ACCOUNT_ID:
+        raise ValueError("Set NS_ACCOUNT_ID (or NS_REST_BASE_URL) to use the NetSuite REST API.")
+    account = Config.NS_ACCOUNT_ID.lower().replace("_", "-")
+    return f"https://{account}.suitetalk.api.netsuite.com"
+
+
+def has_api_credentials() -> bool:
+    tba = all([Config.NS_CONSUMER_KEY, Config.NS_CONSUMER_SECRET, Config.NS_TOKEN_ID, Config.NS_TOKEN_SECRET])
+    has_url = bool(Config.NS_REST_BASE_URL or Config.NS_ACCOUNT_ID)
+    return has_url and bool(Config.NS_ACCESS_TOKEN or tba)
+
+
+def oauth1_header(method: str, url: str) -> str:
+    """Token-based authentication header (OAuth 1.0a, HMAC-SHA256) for one request."""
+    parsed = urllib.parse.urlparse(url)
+    base_url = f"{parsed.scheme}://{parsed.netloc}{parsed.path}"
+    oauth = {
+        "oauth_consumer_key": Config.NS_CONSUMER_KEY,
+        "oauth_token": Config.NS_TOKEN_ID,
+        "oauth_signature_method": "HMAC-SHA256",
+        "oauth_timestamp": str(int(time.time())),
+        "oauth_nonce": secrets.token_hex(16),
+        "oauth_version": "1.0",
+    }
+    params = list(oauth.items()) + urllib.parse.parse_qsl(parsed.query, keep_blank_values=True)
+    encoded = sorted((_quote(k), _quote(v)) for k, v in params)
+    param_str = "&".join(f"{k}={v}" for k, v in encoded)
+    base_string = "&".join([method.upper(), _quote(base_url), _quote(param_str)])
+    key = f"{_quote(Config.NS_CONSUMER_SECRET)}&{_quote(Config.NS_TOKEN_SECRET)}"
+    digest = hmac.new(key.encode(), base_string.encode(), hashlib.sha256).digest()
+    oauth["oauth_signature"] = base64.b64encode(digest).decode()
+    realm = (Config.NS_ACCOUNT_ID or "").upper().replace("-", "_")
+    return f'OAuth realm="{realm}", ' + ", ".join(f'{k}="{_quote(v)}"' for k, v in oauth.items())
+
+
+class NetSuiteClient:
+    """Pooled, keep-alive session that signs every request."""
+
+    def __init__(self, pool_size: int = 0):
+        pool_size = pool_size or Config.NS_SUBMIT_WORKERS
+        self.base_url = api_base_url()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, pool_size))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers["Content-Type"] = "application/json"
+        self.session.headers["Accept"] = "application/json"
+
+    def request(self, method: str, path: str, body: Optional[Dict] = None, headers: Optional[Dict] = None) -> requests.Response:
+        url = path if path.startswith("http") else self.base_url + path
+        headers = dict(headers or {})
+        if Config.NS_ACCESS_TOKEN:
+            headers["Authorization"] = f"Bearer {Config.NS_ACCESS_TOKEN}"
+        else:
+            headers["Authorization"] = oauth1_header(method, url)
+        return self.session.request(
+            method, url, data=json.dumps(body) if body is not None else None,
+            headers=headers, timeout=Config.PAGE_LOAD_TIMEOUT,
+        )
+
+    def close(self) -> None:
+        self.session.close()
+
+
+def record_ref(value: str) -> Dict[str, str]:
+    """Reference another record by its internal id."""
+    return {"id": str(value).strip()}
+
+
+def _internal_id(value: str) -> str:
+    value = str(value or "").strip()
+    return value if value.isdigit() else ""
+
+
+def _quantity(value: str) -> float:
+    try:
+        return float(value or 1)
+    except ValueError:
+        return 1.0
+
+
+def build_sales_order_body(mapped: Dict[str, str]) -> Dict:
+    items = [
+        {"item": record_ref(line.get("item_id") or _internal_id(line["item"])), "quantity": _quantity(line.get("quantity"))}
+        for line in order_lines(mapped)
+    ]
+    body: Dict = {
+        "entity": record_ref(mapped["entity"]),
+        "memo": mapped.get("memo", ""),
+        "item": {"items": items},
+    }
+    if mapped.get("external_id"):
+        body["externalId"] = mapped["external_id"]
+    elif mapped.get("entry_id"):
+        body["externalId"] = external_id(get_form_id_from_admin_url(Config.WP_ADMIN_URL), [mapped["entry_id"]])
+    return body
+
+
+def _error_text(resp: requests.Response) -> str:
+    try:
+        details = resp.json().get("o:errorDetails") or []
+        if details:
+            return "; ".join(d.get("detail", "") for d in details)
+    except ValueError:
+        pass
+    return resp.text[:500]
+
+
+def create_sales_order(client: NetSuiteClient, mapped: Dict[str, str]) -> Dict[str, str]:
+    result = {"entry_id": mapped.get("entry_id", ""), "ok": "", "id": "", "status": "", "error": ""}
+    if len(order_entry_ids(mapped)) > 1:
+        result["entry_id"] = ",".join(order_entry_ids(mapped))
+    # Without internal ids NetSuite would get references to nothing; fail without spending a request
+    unmatched = [line["item"] for line in order_lines(mapped) if not line.get("item_id") and not _internal_id(line["item"])]
+    if unmatched:
+        where = "not in catalog" if get_catalog() is not None else "no internal id (set NS_ITEM_CATALOG)"
+        result["error"] = f"Item {where}: {', '.join(unmatched)}"
+        return result
+    if not _internal_id(mapped["entity"]):
+        result["error"] = f"Customer not resolved to an internal id: {mapped['entity']}"
+        return result
+    with span("ns.rest.create", entry_id=result["entry_id"]) as s:
+        try:
+            resp = client.request("POST", SALES_ORDER_PATH, build_sales_order_body(mapped))
+        except requests.RequestException as e:
+            result["error"] = str(e)
+            s.tag(outcome="network_error")
+            return result
+        result["status"] = str(resp.status_code)
+        if resp.status_code in (200, 201, 204):
+            # The new record's internal id is the last segment of the Location header
+            location = resp.headers.get("Location", "")
+            result["id"] = location.rstrip("/").rsplit("/", 1)[-1] if location else ""
+            result["ok"] = "1"
+        else:
+            result["error"] = _error_text(resp)
+            s.tag(outcome=f"http_{resp.status_code}")
+    return result
+
+
+def submit_sales_orders(
+    client: NetSuiteClient,
+    orders: Iterable[Dict[str, str]],
+    workers: int = 0,
+    batch_size: int = 0,
+    resolver=None,
+) -> Iterator[Dict[str, str]]:
+    """Submit orders batch by batch, each batch concurrently; results keep input order.
+
+    With a customer_cache.CustomerResolver, each batch's customers are looked
+    up together and orders reference them by internal id.
+    """
+    workers = workers or Config.NS_SUBMIT_WORKERS
+    batch_size = batch_size or Config.NS_BATCH_SIZE
+
+    def _submit(pool, batch: List[Dict[str, str]]) -> Iterator[Dict[str, str]]:
+        if resolver is not None:
+            resolver.prefetch(batch)
+            batch = [resolver.apply(m) for m in batch]
+        return pool.map(lambda m: create_sales_order(client, m), batch)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        batch: List[Dict[str, str]] = []
+        for mapped in orders:
+            batch.append(mapped)
+            if len(batch) >= batch_size:
+                yield from _submit(pool, batch)
+                batch = []
+        if batch:
+            yield from _submit(pool, batch)
+
+
+def iter_entries_from_paths(paths: Iterable[str]) -> Iterator[Tuple[str, Dict[str, str]]]:
+    for path in paths:
+        entry = load_entry(path)
+        yield map_entry(entry)["entry_id"], entry
+
+
+def iter_new_orders(
+    entries: Iterable[Tuple[str, Dict[str, str]]],
+    index: Optional[DedupIndex],
+    form_id: str,
+    hashes: Dict[str, str],
+    force: bool = False,
+) -> Iterator[Dict[str, str]]:
+    """Map entries to orders, skipping entries the dedup index already has an order for."""
+    for entry_id, entry in entries:
+        if index is not None:
+            digest = content_hash(entry)
+            state, order_id = index.check(form_id, entry_id, digest)
+            if state == UNCHANGED and not force:
+                print(f"Entry {entry_id}: unchanged, already Sales Order {order_id}; skipped")
+                continue
+            if state == CHANGED and not force:
+                print(f"Entry {entry_id}: changed since Sales Order {order_id}; skipped (use --force to submit again)")
+                continue
+            hashes[entry_id] = digest
+        yield dict(map_entry(entry), entry_id=entry_id)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Create NetSuite Sales Orders through the REST record API.")
+    parser.add_argument("paths", nargs="*", help="Entry JSON files")
+    parser.add_argument("--store", nargs="?", const="", default=None, metavar="DB",
+                        help="Submit mapped entries from the SQLite entry store (default: ENTRY_STORE)")
+    parser.add_argument("--workers", type=int, default=0, help=f"Concurrent submissions (default: NS_SUBMIT_WORKERS={Config.NS_SUBMIT_WORKERS})")
+    parser.add_argument("--batch-size", type=int, default=0, help=f"Orders per batch (default: NS_BATCH_SIZE={Config.NS_BATCH_SIZE})")
+    parser.add_argument("--force", action="store_true", help="Submit entries the dedup index already has an order for")
+    parser.add_argument("--consolidate", type=float, default=None, metavar="HOURS",
+                        help=f"One order per customer and site within HOURS (default: NS_CONSOLIDATE_HOURS={Config.NS_CONSOLIDATE_HOURS:g}; 0 = off)")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue the last run from the journal (JOURNAL_FILE), skipping entries it already submitted")
+    args = parser.parse_args()
+
+    if not has_api_credentials():
+        print("Set NS_ACCOUNT_ID (or NS_REST_BASE_URL) and NS_CONSUMER_KEY/NS_CONSUMER_SECRET/NS_TOKEN_ID/NS_TOKEN_SECRET (or NS_ACCESS_TOKEN).")
+        print("Without API access, use netsuite_create_so.py (browser form fill).")
+        return 2
+
+    journal = None
+    if args.resume:
+        try:
+            journal = open_journal("rest", resume=True)
+        except ValueError as e:
+            print(e)
+            return 2
+        if not args.paths and args.store is None:
+            args.paths = journal.args.get("paths") or []
+            args.store = journal.args.get("store")
+        if args.consolidate is None:
+            args.consolidate = journal.args.get("consolidate")
+    else:
+        journal = open_journal("rest", args={"paths": args.paths, "store": args.store, "consolidate": args.consolidate})
+    try:
+        return submit_entries(args, journal)
+    finally:
+        if journal is not None:
+            journal.close()
+
+
+def submit_entries(args: argparse.Namespace, journal: Optional[Journal]) -> int:
+    form_id = get_form_id_from_admin_url(Config.WP_ADMIN_URL)
+    store = None
+    if args.store is not None:
+        # Imported here so file-based submission has no extra dependencies
+        from entry_store import EntryStore
+        try:
+            store = EntryStore(args.store)
+        except ValueError as e:
+            print(f"{e}; pass the database path or set ENTRY_STORE.")
+            return 2
+        entries: Iterable[Tuple[str, Dict[str, str]]] = store.iter_entries(form_id, status="mapped")
+    else:
+        missing = [p for p in args.paths if not os.path.exists(p)]
+        if missing or not args.paths:
+            print(f"File not found: {missing[0]}" if missing else "Provide entry JSON paths or --store.")
+            return 2
+        entries = iter_entries_from_paths(args.paths)
+    if journal is not None:
+        submitted = journal.done(SUBMITTED)
+        entries = ((entry_id, entry) for entry_id, entry in entries if entry_id not in submitted)
+
+    index = open_index()
+    hashes: Dict[str, str] = {}
+    orders: Iterable[Dict] = iter_new_orders(entries, index, form_id, hashes, args.force)
+    hours = Config.NS_CONSOLIDATE_HOURS if args.consolidate is None else args.consolidate
+    if hours > 0:
+        # Grouping needs every order of the run before the first submission
+        orders = consolidate_orders(orders, form_id, hours)
+    # Imported here: customer_cache builds on NetSuiteClient from this module
+    from customer_cache import CustomerResolver
+
+    client = NetSuiteClient(args.workers)
+    resolver = CustomerResolver(client)
+    ok = 0
+    failed = 0
+    try:
+        for result in submit_sales_orders(client, orders, args.workers, args.batch_size, resolver):
+            if result["ok"]:
+                ok += 1
+                print(f"Entry {result['entry_id']}: created Sales Order {result['id']}")
+                # A consolidated order reports all of its entries, comma separated
+                entry_ids = result["entry_id"].split(",")
+                for entry_id in entry_ids:
+                    if journal is not None:
+                        journal.record(entry_id, SUBMITTED, order_id=result["id"])
+                    if index is not None and entry_id in hashes:
+                        index.record_order(form_id, entry_id, hashes.pop(entry_id), result["id"])
+                if store is not None:
+                    store.set_status(form_id, entry_ids, "submitted")
+            else:
+                failed += 1
+                print(f"Entry {result['entry_id']}: failed ({result['status'] or 'no response'}) {result['error']}")
+    finally:
+        resolver.close()
+        client.close()
+        if store is not None:
+            store.close()
+        if index is not None:
+            index.close()
+    print(f"Created {ok} Sales Orders, {failed} failed")
+    return 0 if not failed else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,63 +1,138 @@
+"""
+Parse label/value pairs out of saved Gravity Forms entry HTML.
+
+- Uses lxml as the tree builder when installed (falls back to html.parser)
+- Only builds the tree for #wpbody-content, skipping wp-admin menu chrome
+- Collects th/td rows, dl dt/dd and two-td rows in one traversal, plus the
+  sidebar's "Submitted on" time
+- A directory argument parses every entry_*_raw.html in it through a
+  process pool and prints one JSON object per line (backfills)
+"""
+import argparse
+import glob
 import sys
 import os
 import json
-from typing import Dict
-from bs4 import BeautifulSoup
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from bs4 import BeautifulSoup, SoupStrainer
 
+from entry_time import find_submitted_on
+
+try:
+    import lxml  # noqa: F401
+    DEFAULT_PARSER = "lxml"
+except ImportError:
+    DEFAULT_PARSER = "html.parser"
+
+CONTENT_ONLY = SoupStrainer(id="wpbody-content")
+RAW_FILE_RE = re.compile(r"entry_(\d+)_raw\.html$")
+
+
+def _build_soup(html: str, parser: str) -> BeautifulSoup:
+    soup = BeautifulSoup(html, parser, parse_only=CONTENT_ONLY)
+    if soup.find(True) is None:
+        # Not a full wp-admin page (or no content wrapper); parse everything
+        soup = BeautifulSoup(html, parser)
+    return soup
 
-def parse_entry_html(html: str) -> Dict[str, str]:
-    soup = BeautifulSoup(html, "html.parser")
-    result: Dict[str, str] = {}
 
-    # Try tables with th/td
-    for row in soup.select("table tr"):
-        th = row.find("th")
+def parse_entry_html(html: str, parser: Optional[str] = None) -> Dict[str, str]:
+    soup = _build_soup(html, parser or DEFAULT_PARSER)
+    th_pairs: List[Tuple[str, str]] = []
+    dl_pairs: List[Tuple[str, str]] = []
+    td_pairs: List[Tuple[str, str]] = []
+
+    # One pass over every candidate element, in document order
+    for el in soup.select("table tr, dl dt"):
+        if el.name == "dt":
+            # Definition lists dt/dd
+            dd = el.find_next_sibling("dd")
+            if dd:
+                dl_pairs.append((el.get_text(strip=True), dd.get_text(" ", strip=True)))
+            continue
+        # Tables with th/td: value in next td
+        th = el.find("th")
         if th:
-            # value in next td
-            td = row.find("td")
+            td = el.find("td")
             if td:
-                k = th.get_text(strip=True)
-                v = td.get_text(" ", strip=True)
-                if k and v:
-                    result[k] = v
-
-    # Try definition lists dt/dd
-    for dt in soup.select("dl dt"):
-        dd = dt.find_next_sibling("dd")
-        if dd:
-            k = dt.get_text(strip=True)
-            v = dd.get_text(" ", strip=True)
-            if k and v and k not in result:
-                result[k] = v
-
-    # Fallback: two-column rows (first td label, second value)
-    for row in soup.select("table tr"):
-        tds = row.find_all("td")
+                th_pairs.append((th.get_text(strip=True), td.get_text(" ", strip=True)))
+        # Two-column rows (first td label, second value)
+        tds = el.find_all("td")
         if len(tds) >= 2:
-            k = tds[0].get_text(strip=True)
-            v = tds[1].get_text(" ", strip=True)
+            td_pairs.append((tds[0].get_text(strip=True), tds[1].get_text(" ", strip=True)))
+
+    # Same precedence as before: th/td rows win (last one for a label),
+    # then dt/dd and two-td rows only fill in labels not seen yet
+    result: Dict[str, str] = {}
+    for k, v in th_pairs:
+        if k and v:
+            result[k] = v
+    for pairs in (dl_pairs, td_pairs):
+        for k, v in pairs:
             if k and v and k not in result:
                 result[k] = v
-
+    if result and "Submitted on" not in result:
+        submitted = find_submitted_on(soup.get_text(" "))
+        if submitted:
+            result["Submitted on"] = submitted
     return result
 
 
+def parse_saved_file(path: str, parser: Optional[str] = None) -> Dict[str, str]:
+    with open(path, "r", encoding="utf-8") as f:
+        data = parse_entry_html(f.read(), parser)
+    m = RAW_FILE_RE.search(os.path.basename(path))
+    if m:
+        data.setdefault("Entry Id", m.group(1))
+    return data
+
+
+def find_saved_files(directory: str) -> List[str]:
+    return sorted(glob.glob(os.path.join(directory, "entry_*_raw.html")))
+
+
+def parse_saved_files(paths: Iterable[str], workers: int = 0, parser: Optional[str] = None) -> Iterator[Tuple[str, Dict[str, str]]]:
+    """Parse many saved pages in a process pool, yielding (path, data) in input order."""
+    paths = list(paths)
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(paths) <= 1:
+        for path in paths:
+            yield path, parse_saved_file(path, parser)
+        return
+    parsers = [parser] * len(paths)
+    chunksize = max(1, len(paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for path, data in zip(paths, pool.map(parse_saved_file, paths, parsers, chunksize=chunksize)):
+            yield path, data
+
+
 def main() -> int:
-    if len(sys.argv) < 2:
-        print("Usage: python parse_saved_entry.py /path/to/entry_raw.html")
-        return 2
-    path = sys.argv[1]
+    arg_parser = argparse.ArgumentParser(description="Parse saved Gravity Forms entry HTML.")
+    arg_parser.add_argument("path", help="entry_raw.html file, or a directory of entry_*_raw.html files")
+    arg_parser.add_argument("--workers", type=int, default=0, help="Processes for directory backfills (default: CPU count)")
+    arg_parser.add_argument("--parser", default=None, help=f"BeautifulSoup tree builder (default: {DEFAULT_PARSER})")
+    args = arg_parser.parse_args()
+
+    path = args.path
     if not os.path.exists(path):
         print(f"File not found: {path}")
         return 2
+    if os.path.isdir(path):
+        paths = find_saved_files(path)
+        if not paths:
+            print(f"No entry_*_raw.html files in: {path}")
+            return 2
+        for _, data in parse_saved_files(paths, args.workers, args.parser):
+            sys.stdout.write(json.dumps(data, ensure_ascii=False) + "\n")
+        return 0
     with open(path, "r", encoding="utf-8") as f:
         html = f.read()
-    data = parse_entry_html(html)
+    data = parse_entry_html(html, args.parser)
     print(json.dumps(data, ensure_ascii=False, indent=2))
     return 0
 
 
 if __name__ == "__main__":
     raise SystemExit(main())
-
-
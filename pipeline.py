@@ -0,0 +1,331 @@
+"""
+Run extract -> parse -> map -> submit in one process with overlapping stages.
+
+- Stages are connected by bounded asyncio queues (PIPELINE_QUEUE_SIZE), so
+  a slow stage applies backpressure instead of letting work pile up.
+- Each stage runs its own number of workers; blocking Selenium and HTTP
+  calls run in a thread pool executor.
+- extract: open_entry_by_id + visible text (pool of logged-in Chrome drivers);
+           failures and empty pages are retried with backoff (retry.py)
+- parse:   parse_text_lines
+- map:     netsuite_create_so.map_entry / map_to_netsuite_so.map_to_so_rows
+- submit:  rest (netsuite_rest), ui (netsuite_create_so form fill, one
+           NetSuite session), csv (one consolidated import CSV) or none
+- Customers are resolved to NetSuite internal ids through customer_cache
+  before rest/ui submission
+- Products missing from the item catalog (NS_ITEM_CATALOG) fail in the map
+  stage instead of at submission
+- Entries the dedup index (DEDUP_INDEX) already has an order for are not
+  mapped or submitted again; --force overrides
+- A summary with per-stage counts, failures and busy time is printed at the end.
+"""
+import argparse
+import asyncio
+import csv
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from config import Config
+from customer_cache import CustomerResolver
+from batch_export import parse_entry_ids
+from dedup_index import CHANGED, UNCHANGED, content_hash, open_index
+from export_entry_by_text import parse_text_lines, read_visible_text, wait_for_entry_content
+from export_first_entry import get_form_id_from_admin_url, open_entry_by_id
+from item_catalog import get_catalog
+from login_agent import build_driver
+from map_to_netsuite_so import map_to_so_rows, so_csv_fields
+from netsuite_create_so import create_order, map_entry
+from netsuite_login import perform_netsuite_login
+from netsuite_rest import NetSuiteClient, create_sales_order, has_api_credentials
+from retry import DriverSession, EmptyEntryError, retry_call
+
+
+_DONE = object()
+_SKIP = object()  # stage result: nothing left to do for this entry
+STAGES = ("extract", "parse", "map", "submit")
+
+
+class PipelineStats:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.done: Dict[str, int] = {name: 0 for name in STAGES}
+        self.busy: Dict[str, float] = {name: 0.0 for name in STAGES}
+        self.skipped = 0
+        self.failures: List[tuple] = []
+
+    def summary(self) -> str:
+        elapsed = time.perf_counter() - self.started
+        lines = [f"Pipeline finished in {elapsed:.1f}s"]
+        for name in STAGES:
+            lines.append(f"- {name:<8} {self.done[name]:>6} ok   busy {self.busy[name]:.1f}s")
+        lines.append(f"- skipped  {self.skipped:>6} (already ordered, unchanged)")
+        lines.append(f"- failures {len(self.failures)}")
+        for stage, entry_id, error in self.failures[:20]:
+            lines.append(f"  {stage} {entry_id}: {error}")
+        return "\n".join(lines)
+
+
+async def run_stage(
+    name: str,
+    inbox: asyncio.Queue,
+    outbox: Optional[asyncio.Queue],
+    fn: Callable[[str, object], Awaitable[object]],
+    workers: int,
+    downstream_workers: int,
+    stats: PipelineStats,
+) -> None:
+    async def worker() -> None:
+        while True:
+            item = await inbox.get()
+            if item is _DONE:
+                return
+            entry_id, payload = item
+            t0 = time.perf_counter()
+            try:
+                result = await fn(entry_id, payload)
+            except Exception as e:
+                stats.failures.append((name, entry_id, str(e) or type(e).__name__))
+                continue
+            finally:
+                stats.busy[name] += time.perf_counter() - t0
+            if result is None:
+                stats.failures.append((name, entry_id, "no result"))
+                continue
+            if result is _SKIP:
+                stats.skipped += 1
+                continue
+            stats.done[name] += 1
+            if outbox is not None:
+                await outbox.put((entry_id, result))
+
+    await asyncio.gather(*(worker() for _ in range(workers)))
+    if outbox is not None:
+        for _ in range(downstream_workers):
+            await outbox.put(_DONE)
+
+
+class DriverPool:
+    """Logged-in Chrome drivers handed out one task at a time."""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.idle: asyncio.Queue = asyncio.Queue()
+        self.browsers: List[DriverSession] = []
+
+    async def start(self, loop, executor) -> None:
+        def _make(cookies=None) -> DriverSession:
+            browser = DriverSession(cookies=cookies)
+            self.browsers.append(browser)
+            return browser.start()
+
+        # First login populates the session; the rest start from its cookies
+        first = await loop.run_in_executor(executor, _make)
+        rest = await asyncio.gather(*(loop.run_in_executor(executor, _make, first.cookies) for _ in range(self.size - 1)))
+        for browser in [first, *rest]:
+            self.idle.put_nowait(browser)
+
+    async def run(self, loop, executor, fn, *args, label: str = ""):
+        """fn(driver, *args) under the retry policy; a crashed driver is replaced in place."""
+        browser = await self.idle.get()
+        try:
+            return await loop.run_in_executor(
+                executor, lambda: retry_call(lambda: fn(browser.driver, *args), label, browser.restart)
+            )
+        finally:
+            self.idle.put_nowait(browser)
+
+    def close(self) -> None:
+        for browser in self.browsers:
+            browser.quit()
+
+
+def extract_visible_lines(driver, entry_id: str) -> List[str]:
+    open_entry_by_id(driver, entry_id)
+    wait_for_entry_content(driver)
+    lines = read_visible_text(driver).splitlines()
+    if not parse_text_lines(lines):
+        # Half-loaded page: retry now rather than fail in the parse stage
+        raise EmptyEntryError("no fields found")
+    return lines
+
+
+def parse_lines(entry_id: str, lines: List[str]) -> Optional[Dict[str, str]]:
+    record = {k: v for k, v in parse_text_lines(lines)}
+    if not record:
+        return None
+    record.setdefault("Entry Id", entry_id)
+    return record
+
+
+async def run_pipeline(
+    entry_ids: List[str],
+    submit: str = "csv",
+    extract_workers: int = 1,
+    submit_workers: int = 1,
+    queue_size: int = 0,
+    out_path: str = "",
+    force: bool = False,
+) -> PipelineStats:
+    loop = asyncio.get_running_loop()
+    queue_size = queue_size or Config.PIPELINE_QUEUE_SIZE
+    if submit == "ui":
+        # One NetSuite browser session; orders are filled one at a time
+        submit_workers = 1
+    executor = ThreadPoolExecutor(max_workers=extract_workers + submit_workers + 2)
+    stats = PipelineStats()
+
+    id_q: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    raw_q: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    record_q: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    mapped_q: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    drivers = DriverPool(extract_workers)
+    csv_file = None
+    client = None
+    resolver = None
+    ns_login = None
+    ns_driver = None
+    index = open_index()
+    catalog = get_catalog()
+    form_id = get_form_id_from_admin_url(Config.WP_ADMIN_URL)
+    try:
+        await drivers.start(loop, executor)
+
+        async def extract(entry_id: str, _) -> List[str]:
+            return await drivers.run(loop, executor, extract_visible_lines, entry_id, label=f"Entry {entry_id}")
+
+        async def parse(entry_id: str, lines: List[str]) -> Optional[Dict[str, str]]:
+            return parse_lines(entry_id, lines)
+
+        async def map_(entry_id: str, record: Dict[str, str]):
+            digest = content_hash(record)
+            if index is not None and not force:
+                state, order_id = index.check(form_id, entry_id, digest)
+                if state == UNCHANGED:
+                    return _SKIP
+                if state == CHANGED:
+                    raise RuntimeError(f"changed since Sales Order {order_id}; rerun with --force to submit again")
+            order = dict(map_entry(record), entry_id=entry_id)
+            if not order["item_id"] and catalog is not None and submit != "none":
+                raise RuntimeError(f"item not in catalog: {order['item']}")
+            return {"order": order, "rows": map_to_so_rows(record), "hash": digest}
+
+        if submit == "rest":
+            client = NetSuiteClient(submit_workers)
+            resolver = CustomerResolver(client)
+
+            async def submit_one(entry_id: str, mapped):
+                order = await loop.run_in_executor(executor, resolver.apply, mapped["order"])
+                result = await loop.run_in_executor(executor, create_sales_order, client, order)
+                if not result["ok"]:
+                    raise RuntimeError(f"{result['status']} {result['error']}".strip())
+                return result["id"]
+        elif submit == "ui":
+            username = os.getenv("NS_USERNAME", "")
+            password = os.getenv("NS_PASSWORD", "")
+            login_url = os.getenv("NS_LOGIN_URL", "https://system.netsuite.com/pages/customerlogin.jsp?country=US")
+
+            def _ns_login():
+                driver = build_driver(headless=False)
+                perform_netsuite_login(driver, login_url, username, password)
+                return driver
+
+            # Log in to NetSuite while WordPress extraction is already running
+            ns_login = loop.run_in_executor(executor, _ns_login)
+            if has_api_credentials():
+                client = NetSuiteClient(1)
+            resolver = CustomerResolver(client)
+
+            async def submit_one(entry_id: str, mapped):
+                nonlocal ns_driver
+                order = await loop.run_in_executor(executor, resolver.apply, mapped["order"])
+                ns_driver = ns_driver or await ns_login
+                so_id = await loop.run_in_executor(executor, create_order, ns_driver, order, True)
+                if not so_id:
+                    raise RuntimeError("Sales Order not saved")
+                return so_id
+        elif submit == "csv":
+            if not out_path:
+                ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+                out_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), f"netsuite_sales_orders_{ts}.csv")
+            csv_file = open(out_path, "w", newline="", encoding="utf-8")
+            writer = csv.DictWriter(csv_file, fieldnames=so_csv_fields(), extrasaction="ignore")
+            writer.writeheader()
+
+            async def submit_one(entry_id: str, mapped):
+                writer.writerows(mapped["rows"])
+                return f"csv:{os.path.basename(out_path)}"
+        else:
+            async def submit_one(entry_id: str, mapped):
+                return True
+
+        async def submit_and_record(entry_id: str, mapped):
+            order_id = await submit_one(entry_id, mapped)
+            if index is not None and submit != "none":
+                index.record_order(form_id, entry_id, mapped["hash"], order_id)
+            return True
+
+        async def feed() -> None:
+            for entry_id in entry_ids:
+                await id_q.put((entry_id, None))
+            for _ in range(extract_workers):
+                await id_q.put(_DONE)
+
+        await asyncio.gather(
+            feed(),
+            run_stage("extract", id_q, raw_q, extract, extract_workers, 1, stats),
+            run_stage("parse", raw_q, record_q, parse, 1, 1, stats),
+            run_stage("map", record_q, mapped_q, map_, 1, submit_workers, stats),
+            run_stage("submit", mapped_q, None, submit_and_record, submit_workers, 0, stats),
+        )
+    finally:
+        drivers.close()
+        if csv_file is not None:
+            csv_file.close()
+            print(f"Wrote CSV: {out_path}")
+        if resolver is not None:
+            resolver.close()
+        if client is not None:
+            client.close()
+        if ns_driver is None and ns_login is not None and ns_login.done() and not ns_login.exception():
+            ns_driver = ns_login.result()
+        if ns_driver is not None:
+            try:
+                ns_driver.quit()
+            except Exception:
+                pass
+        if index is not None:
+            index.close()
+        executor.shutdown(wait=False)
+    return stats
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Extract, parse, map and submit Gravity Forms entries in one pipeline.")
+    parser.add_argument("ids", nargs="+", help="Entry ids, comma lists, ranges (a-b) or @file")
+    parser.add_argument("--submit", choices=["rest", "ui", "csv", "none"], default="csv",
+                        help="rest: NetSuite REST API; ui: NetSuite form fill; csv: one import CSV (default)")
+    parser.add_argument("--extract-workers", type=int, default=1, help="Chrome drivers scraping WordPress")
+    parser.add_argument("--submit-workers", type=int, default=0, help=f"Concurrent submissions (default: NS_SUBMIT_WORKERS={Config.NS_SUBMIT_WORKERS})")
+    parser.add_argument("--queue-size", type=int, default=0, help=f"Bound of each stage queue (default: PIPELINE_QUEUE_SIZE={Config.PIPELINE_QUEUE_SIZE})")
+    parser.add_argument("--out", default="", help="CSV path for --submit csv")
+    parser.add_argument("--force", action="store_true", help="Map and submit entries the dedup index already has an order for")
+    args = parser.parse_args()
+
+    try:
+        entry_ids = parse_entry_ids(args.ids)
+    except (OSError, ValueError) as e:
+        print(f"Invalid entry ids: {e}")
+        return 2
+    extract_workers = max(1, min(args.extract_workers, Config.WORKER_COUNT))
+    submit_workers = max(1, args.submit_workers or Config.NS_SUBMIT_WORKERS)
+    stats = asyncio.run(run_pipeline(entry_ids, args.submit, extract_workers, submit_workers, args.queue_size, args.out, args.force))
+    print(stats.summary())
+    return 0 if not stats.failures else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
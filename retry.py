@@ -0,0 +1,160 @@
+"""
+Retry policy for per-entry work (MAX_RETRIES, RETRY_DELAY).
+
+- Up to MAX_RETRIES more attempts after the first, waiting
+  RETRY_DELAY * 2^(n-1) seconds (capped at RETRY_MAX_DELAY) with jitter, so
+  parallel workers that failed together do not retry together
+- Retryable: Selenium timeouts, stale/missing elements and a dead driver,
+  requests connection errors and timeouts, HTTP 429/5xx, and entries that
+  came back without any fields (EmptyEntryError); anything else (bad ids,
+  invalid arguments/selectors, script errors, HTTP 4xx, programming errors)
+  fails at once
+- A crashed Chrome (invalid session, "chrome not reachable", closed window)
+  is replaced by DriverSession.restart: a new driver gets the saved session
+  cookies and only logs in again when WordPress no longer accepts them
+"""
+import random
+import time
+from typing import Callable, Dict, List, Optional, TypeVar
+
+import requests
+from urllib3.exceptions import MaxRetryError, ProtocolError
+from selenium.common.exceptions import (
+    InvalidSessionIdException,
+    NoSuchElementException,
+    NoSuchWindowException,
+    StaleElementReferenceException,
+    TimeoutException,
+    WebDriverException,
+)
+
+from config import Config
+from login_agent import build_driver
+from session_store import apply_cookies, is_logged_in, login_with_session
+from tracing import span
+
+
+T = TypeVar("T")
+
+RETRYABLE_HTTP_STATUS = {429, 500, 502, 503, 504}
+
+# WebDriverException messages that mean the browser itself is gone
+DEAD_DRIVER_MARKERS = (
+    "invalid session id",
+    "chrome not reachable",
+    "disconnected",
+    "no such window",
+    "target window already closed",
+    "session deleted",
+    "connection refused",
+)
+
+
+class EmptyEntryError(RuntimeError):
+    """An entry page produced no label/value pairs (usually a half-loaded page)."""
+
+
+def is_driver_dead(exc: BaseException) -> bool:
+    if isinstance(exc, (InvalidSessionIdException, NoSuchWindowException)):
+        return True
+    if isinstance(exc, WebDriverException) and not isinstance(exc, TimeoutException):
+        message = (exc.msg or str(exc)).lower()
+        return any(marker in message for marker in DEAD_DRIVER_MARKERS)
+    # chromedriver itself is gone, so the HTTP call to it failed
+    return isinstance(exc, (ConnectionError, MaxRetryError, ProtocolError))
+
+
+# Page-level Selenium errors that another attempt can get past
+RETRYABLE_WEBDRIVER_ERRORS = (TimeoutException, StaleElementReferenceException, NoSuchElementException)
+
+
+def is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, (EmptyEntryError, RETRYABLE_WEBDRIVER_ERRORS, TimeoutError)) or is_driver_dead(exc):
+        return True
+    if isinstance(exc, requests.HTTPError):
+        return exc.response is not None and exc.response.status_code in RETRYABLE_HTTP_STATUS
+    return isinstance(exc, (requests.ConnectionError, requests.Timeout))
+
+
+def backoff_delay(attempt: int, base: float = 0, cap: float = 0) -> float:
+    """Seconds to wait before retry number `attempt` (1-based): half fixed, half random."""
+    base = base or Config.RETRY_DELAY
+    cap = cap or Config.RETRY_MAX_DELAY
+    delay = min(cap, base * 2 ** (attempt - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def retry_call(
+    fn: Callable[[], T],
+    label: str = "",
+    recover: Optional[Callable[[], None]] = None,
+    retries: Optional[int] = None,
+) -> T:
+    """Call fn, retrying retryable errors; recover() runs first when the driver died.
+
+    The last error is re-raised once the retries are used up.
+    """
+    retries = Config.MAX_RETRIES if retries is None else retries
+    attempt = 0
+    while True:
+        try:
+            return fn()
+        except Exception as e:
+            if attempt >= retries or not is_retryable(e):
+                raise
+            attempt += 1
+            delay = backoff_delay(attempt)
+            reason = str(e).strip().splitlines()[0] if str(e).strip() else type(e).__name__
+            print(f"{label or 'Attempt'} failed ({reason}); retry {attempt}/{retries} in {delay:.1f}s")
+            time.sleep(delay)
+            if recover is not None and is_driver_dead(e):
+                with span("wp.driver.restart"):
+                    recover()
+
+
+class DriverSession:
+    """A logged-in WordPress driver that can be rebuilt after Chrome crashes.
+
+    The session cookies are kept after login, so a replacement driver is
+    logged in by setting them instead of going through wp-login.php again.
+    """
+
+    def __init__(self, driver=None, cookies: Optional[List[Dict]] = None, headless: Optional[bool] = None):
+        self.driver = driver
+        self.cookies = cookies
+        self.headless = Config.HEADLESS_MODE if headless is None else headless
+
+    def start(self) -> "DriverSession":
+        if self.driver is None:
+            self.driver = build_driver(headless=self.headless)
+            if self.cookies:
+                self._resume()
+            else:
+                login_with_session(self.driver)
+        if not self.cookies:
+            self.cookies = self.driver.get_cookies()
+        return self
+
+    def _resume(self) -> None:
+        apply_cookies(self.driver, self.cookies or [])
+        try:
+            self.driver.get(Config.WP_ADMIN_URL)
+        except TimeoutException:
+            pass
+        if not is_logged_in(self.driver):
+            # Cookies were rejected: log in (or restore a newer cached session)
+            login_with_session(self.driver)
+            self.cookies = self.driver.get_cookies()
+
+    def restart(self) -> None:
+        self.quit()
+        self.driver = build_driver(headless=self.headless)
+        self._resume()
+
+    def quit(self) -> None:
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            self.driver = None
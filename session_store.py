@@ -0,0 +1,157 @@
+"""
+Persist the authenticated WordPress session between runs.
+
+- After a successful `perform_login`, the browser cookies are written to
+  `Config.SESSION_FILE` together with the time they were saved.
+- On the next run the cookies are restored into a fresh driver and checked
+  against wp-admin; the full form login only runs when they are missing,
+  stale or rejected by the server.
+"""
+import json
+import os
+import time
+import urllib.parse
+from typing import Dict, List, Optional
+
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import TimeoutException
+
+from config import Config
+from login_agent import perform_login, wait_for_element
+from tracing import traced
+
+
+AUTH_COOKIE_PREFIX = "wordpress_logged_in_"
+
+
+def site_origin(url: str) -> str:
+    parsed = urllib.parse.urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+
+def session_path() -> str:
+    path = Config.SESSION_FILE
+    if os.path.isabs(path):
+        return path
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), path)
+
+
+def load_session(path: Optional[str] = None) -> Optional[Dict]:
+    path = path or session_path()
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or not data.get("cookies"):
+        return None
+    return data
+
+
+def session_is_fresh(data: Optional[Dict], now: Optional[float] = None) -> bool:
+    """Cheap offline check: saved recently and auth cookie not yet expired."""
+    if not data:
+        return False
+    now = now or time.time()
+    if now - float(data.get("saved_at", 0)) > Config.SESSION_MAX_AGE:
+        return False
+    auth = [c for c in data.get("cookies", []) if c.get("name", "").startswith(AUTH_COOKIE_PREFIX)]
+    if not auth:
+        return False
+    for cookie in auth:
+        expiry = cookie.get("expiry")
+        if expiry is not None and float(expiry) <= now:
+            return False
+    return True
+
+
+def save_session(driver, path: Optional[str] = None) -> Optional[str]:
+    path = path or session_path()
+    try:
+        cookies: List[Dict] = driver.get_cookies()
+    except Exception:
+        return None
+    if not any(c.get("name", "").startswith(AUTH_COOKIE_PREFIX) for c in cookies):
+        # Nothing worth keeping; login did not complete
+        return None
+    try:
+        user_agent = driver.execute_script("return navigator.userAgent") or ""
+    except Exception:
+        user_agent = ""
+    data = {
+        "origin": site_origin(Config.WP_ADMIN_URL),
+        "saved_at": time.time(),
+        "user_agent": user_agent,
+        "cookies": cookies,
+    }
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+    try:
+        os.chmod(path, 0o600)
+    except OSError:
+        pass
+    return path
+
+
+def clear_session(path: Optional[str] = None) -> None:
+    path = path or session_path()
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def is_logged_in(driver) -> bool:
+    try:
+        url = driver.current_url or ""
+    except Exception:
+        return False
+    if "wp-login.php" in url:
+        return False
+    return wait_for_element(driver, By.CSS_SELECTOR, "#wpbody-content", Config.IMPLICIT_WAIT) is not None
+
+
+def apply_cookies(driver, cookies: List[Dict]) -> None:
+    # Cookies can only be set for the domain currently loaded; robots.txt is
+    # the lightest page on the site that puts us there.
+    try:
+        driver.get(site_origin(Config.WP_ADMIN_URL) + "/robots.txt")
+    except TimeoutException:
+        pass
+    for cookie in cookies:
+        cookie = {k: v for k, v in cookie.items() if k in ("name", "value", "path", "domain", "secure", "httpOnly", "expiry", "sameSite")}
+        try:
+            driver.add_cookie(cookie)
+        except Exception:
+            continue
+
+
+@traced("wp.session.restore", outcome=lambda ok: "restored" if ok else "miss")
+def restore_session(driver, path: Optional[str] = None) -> bool:
+    data = load_session(path)
+    if not session_is_fresh(data):
+        return False
+    apply_cookies(driver, data["cookies"])
+    try:
+        driver.get(Config.WP_ADMIN_URL)
+    except TimeoutException:
+        pass
+    return is_logged_in(driver)
+
+
+@traced("wp.session")
+def login_with_session(driver) -> bool:
+    """Restore the cached session or fall back to `perform_login`.
+
+    Returns True when the cached session was reused.
+    """
+    if Config.SESSION_CACHE and restore_session(driver):
+        return True
+    perform_login(driver)
+    if Config.SESSION_CACHE:
+        save_session(driver)
+    return False
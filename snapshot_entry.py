@@ -1,14 +1,54 @@
 import os
 import sys
 from datetime import datetime
+from typing import Tuple
+
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
 
 from config import Config
+from daemon_client import daemon_request
 from export_first_entry import open_entry_by_id
-from login_agent import build_driver, perform_login
+from login_agent import build_driver
+from session_store import login_with_session
+from tracing import traced
+
+
+@traced("wp.snapshot", entry_arg="entry_id")
+def take_snapshot(driver, entry_id: str) -> Tuple[str, str]:
+    """Open the entry and save a screenshot and a visible-text dump; return both paths."""
+    open_entry_by_id(driver, entry_id)
+
+    # Wait for content area
+    try:
+        WebDriverWait(driver, max(Config.PAGE_LOAD_TIMEOUT, 60)).until(
+            EC.presence_of_element_located((By.CSS_SELECTOR, "#wpbody-content"))
+        )
+    except TimeoutException:
+        pass
+
+    ts = datetime.now().strftime("%Y%m%d_%H%M%S")
+    out_dir = os.path.dirname(os.path.abspath(__file__))
+    png_path = os.path.join(out_dir, f"entry_{entry_id}_{ts}.png")
+    txt_path = os.path.join(out_dir, f"entry_{entry_id}_{ts}.txt")
+
+    # Screenshot
+    try:
+        driver.save_screenshot(png_path)
+    except Exception:
+        pass
+
+    # Visible text
+    try:
+        container = driver.find_element(By.CSS_SELECTOR, "#wpbody-content")
+        text = container.text
+        with open(txt_path, "w", encoding="utf-8") as f:
+            f.write(text)
+    except Exception:
+        pass
+    return png_path, txt_path
 
 
 def main() -> int:
@@ -17,39 +57,20 @@ def main() -> int:
         print("Provide ENTRY_ID env or as first CLI arg.")
         return 2
 
+    # A running browser daemon already has a logged-in Chrome
+    reply = daemon_request("snapshot", {"entry_id": entry_id})
+    if reply is not None:
+        if not reply.get("ok"):
+            print(f"Browser daemon error: {reply.get('error')}")
+            return 1
+        print(f"Saved screenshot: {reply['png']}")
+        print(f"Saved text dump: {reply['txt']}")
+        return 0
+
     driver = build_driver(headless=True)
     try:
-        perform_login(driver)
-        open_entry_by_id(driver, entry_id)
-
-        # Wait for content area
-        try:
-            WebDriverWait(driver, max(Config.PAGE_LOAD_TIMEOUT, 60)).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "#wpbody-content"))
-            )
-        except TimeoutException:
-            pass
-
-        ts = datetime.now().strftime("%Y%m%d_%H%M%S")
-        out_dir = os.path.dirname(os.path.abspath(__file__))
-        png_path = os.path.join(out_dir, f"entry_{entry_id}_{ts}.png")
-        txt_path = os.path.join(out_dir, f"entry_{entry_id}_{ts}.txt")
-
-        # Screenshot
-        try:
-            driver.save_screenshot(png_path)
-        except Exception:
-            pass
-
-        # Visible text
-        try:
-            container = driver.find_element(By.CSS_SELECTOR, "#wpbody-content")
-            text = container.text
-            with open(txt_path, "w", encoding="utf-8") as f:
-                f.write(text)
-        except Exception:
-            pass
-
+        login_with_session(driver)
+        png_path, txt_path = take_snapshot(driver, entry_id)
         print(f"Saved screenshot: {png_path}")
         print(f"Saved text dump: {txt_path}")
         return 0
@@ -62,5 +83,3 @@ def main() -> int:
 
 if __name__ == "__main__":
     raise SystemExit(main())
-
-
@@ -0,0 +1,92 @@
+import urllib.parse
+
+import pytest
+
+from config import Config
+import gf_rest_api
+
+FORM = {
+    "id": 21,
+    "fields": [
+        {"id": 1, "label": "Name", "inputs": [{"id": "1.3", "label": "First"}, {"id": "1.6", "label": "Last"}]},
+        {"id": 2, "label": "Product", "inputs": [
+            {"id": "2.1", "label": "Name"}, {"id": "2.2", "label": "Price"}, {"id": "2.3", "label": "Quantity"},
+        ]},
+        {"id": 3, "label": "Email", "adminLabel": "Employee Email"},
+        {"id": 4, "label": "Site Number"},
+    ],
+}
+
+TOTAL = 1000
+
+
+def entry(entry_id: int) -> dict:
+    return {
+        "id": str(entry_id),
+        "form_id": "21",
+        "date_created": "2025-09-29 17:08:00",
+        "status": "active",
+        "1.3": "Ada",
+        "1.6": "Lovelace",
+        "2.1": "XL Vise Z87 Clear (NO RX)",
+        "2.2": "$12.00",
+        "2.3": "2",
+        "3": "ada@example.com",
+        "4": "",
+    }
+
+
+def entries_route(total: int):
+    """GF v2 paging: offset = (current_page - 1) * page_size, newest first."""
+    def list_entries(request):
+        query = dict(urllib.parse.parse_qsl(request["query"]))
+        assert query["sorting[direction]"] == "DESC"
+        page_size = int(query["paging[page_size]"])
+        offset = (int(query["paging[current_page]"]) - 1) * page_size
+        ids = range(total - offset, max(total - offset - page_size, 0), -1)
+        return 200, {"total_count": total, "entries": [entry(i) for i in ids]}, {}
+    return list_entries
+
+
+@pytest.fixture
+def api(monkeypatch, stub_server):
+    monkeypatch.setattr(Config, "GF_API_BASE_URL", stub_server.url)
+    monkeypatch.setattr(Config, "GF_API_KEY", "ck_test")
+    monkeypatch.setattr(Config, "GF_API_SECRET", "cs_test")
+    monkeypatch.setattr(Config, "WP_TIMEZONE", "America/Chicago")
+    stub_server.routes[("GET", "/forms/21")] = lambda r: (200, FORM, {})
+    stub_server.routes[("GET", "/forms/21/entries")] = entries_route(TOTAL)
+    session = gf_rest_api.build_api_session()
+    yield session
+    session.close()
+
+
+def test_paging_trims_last_page_without_repeating_entries(api, stub_server):
+    pages = list(gf_rest_api.iter_entry_pages(api, "21", page_size=100, max_entries=250))
+
+    ids = [e["id"] for page in pages for e in page]
+    assert [len(page) for page in pages] == [100, 100, 50]
+    assert len(set(ids)) == 250 and ids[0] == str(TOTAL) and ids[-1] == str(TOTAL - 249)
+    sizes = {urllib.parse.parse_qs(r["query"])["paging[page_size]"][0] for r in stub_server.requests}
+    assert sizes == {"100"}
+    assert stub_server.requests[0]["headers"]["Authorization"].startswith("Basic ")
+
+
+def test_paging_stops_at_a_short_last_page(api, stub_server):
+    stub_server.routes[("GET", "/forms/21/entries")] = entries_route(130)
+    pages = list(gf_rest_api.iter_entry_pages(api, "21", page_size=100, max_entries=1000))
+    assert [len(page) for page in pages] == [100, 30]
+
+
+def test_entries_are_mapped_to_pipeline_labels(api):
+    record = next(gf_rest_api.iter_entries(api, "21", page_size=5, max_entries=1))
+
+    assert record["Entry Id"] == str(TOTAL)
+    assert record["First Name"] == "Ada" and record["Last Name"] == "Lovelace"
+    assert record["Product"] == "XL Vise Z87 Clear (NO RX)"
+    assert record["Product (Price)"] == "$12.00"
+    assert record["Quantity"] == "2"
+    assert record["Employee Email"] == "ada@example.com"
+    assert "Site Number" not in record
+    # date_created is UTC; Chicago is UTC-5 in September
+    assert record["Submitted on"] == "2025-09-29 12:08:00"
@@ -0,0 +1,104 @@
+import base64
+import hashlib
+import hmac
+import urllib.parse
+
+import pytest
+
+from config import Config
+from customer_cache import SUITEQL_PATH, CustomerCache, CustomerResolver
+import netsuite_rest
+from netsuite_rest import SALES_ORDER_PATH, NetSuiteClient, create_sales_order
+
+
+@pytest.fixture
+def tba(monkeypatch, stub_server):
+    monkeypatch.setattr(Config, "NS_REST_BASE_URL", stub_server.url)
+    monkeypatch.setattr(Config, "NS_ACCOUNT_ID", "1234567_SB1")
+    monkeypatch.setattr(Config, "NS_CONSUMER_KEY", "ck")
+    monkeypatch.setattr(Config, "NS_CONSUMER_SECRET", "cs")
+    monkeypatch.setattr(Config, "NS_TOKEN_ID", "tk")
+    monkeypatch.setattr(Config, "NS_TOKEN_SECRET", "ts")
+    monkeypatch.setattr(Config, "NS_ACCESS_TOKEN", None)
+    monkeypatch.setattr(netsuite_rest, "get_catalog", lambda: None)
+    client = NetSuiteClient(1)
+    yield client
+    client.close()
+
+
+def _quote(value: str) -> str:
+    return urllib.parse.quote(value, safe="~")
+
+
+def verify_oauth1(request, base_url: str) -> bool:
+    """Check the Authorization header the way NetSuite does (RFC 5849, HMAC-SHA256)."""
+    header = request["headers"]["Authorization"]
+    assert header.startswith('OAuth realm="1234567_SB1", ')
+    params = dict(
+        (k, urllib.parse.unquote(v.strip('"')))
+        for k, v in (part.split("=", 1) for part in header[len("OAuth "):].split(", "))
+    )
+    signature = params.pop("oauth_signature")
+    params.pop("realm")
+    assert params["oauth_consumer_key"] == "ck" and params["oauth_token"] == "tk"
+    pairs = list(params.items()) + urllib.parse.parse_qsl(request["query"], keep_blank_values=True)
+    param_str = "&".join(f"{k}={v}" for k, v in sorted((_quote(k), _quote(v)) for k, v in pairs))
+    base_string = "&".join([request["method"], _quote(base_url + request["path"]), _quote(param_str)])
+    expected = base64.b64encode(hmac.new(b"cs&ts", base_string.encode(), hashlib.sha256).digest()).decode()
+    return hmac.compare_digest(signature, expected)
+
+
+def test_create_sales_order_signs_and_reads_location(tba, stub_server):
+    stub_server.routes[("POST", SALES_ORDER_PATH)] = lambda r: (
+        204, None, {"Location": f"{stub_server.url}{SALES_ORDER_PATH}/987"},
+    )
+    mapped = {"entity": "42", "item": "XL Vise", "item_id": "555", "quantity": "2", "memo": "Entry: 29993", "entry_id": "29993"}
+
+    result = create_sales_order(tba, mapped)
+
+    assert result["ok"] == "1" and result["id"] == "987" and result["status"] == "204"
+    request = stub_server.requests[-1]
+    assert verify_oauth1(request, stub_server.url)
+    assert request["json"]["entity"] == {"id": "42"}
+    assert request["json"]["item"]["items"] == [{"item": {"id": "555"}, "quantity": 2.0}]
+    assert request["json"]["externalId"].endswith("-29993")
+
+
+def test_create_sales_order_reports_netsuite_error(tba, stub_server):
+    stub_server.routes[("POST", SALES_ORDER_PATH)] = lambda r: (
+        400, {"o:errorDetails": [{"detail": "Invalid item reference"}]}, {},
+    )
+    result = create_sales_order(tba, {"entity": "42", "item": "X", "item_id": "1", "quantity": "1"})
+    assert not result["ok"] and result["status"] == "400" and result["error"] == "Invalid item reference"
+
+
+def test_orders_without_internal_ids_fail_before_any_request(tba, stub_server):
+    no_item = create_sales_order(tba, {"entity": "42", "item": "XL Vise", "item_id": "", "quantity": "1"})
+    no_customer = create_sales_order(tba, {"entity": "a@b.com", "item": "X", "item_id": "555", "quantity": "1"})
+    assert "XL Vise" in no_item["error"] and "a@b.com" in no_customer["error"]
+    assert stub_server.requests == []
+
+
+def test_suiteql_lookup_resolves_customers(tba, stub_server, tmp_path):
+    def suiteql(request):
+        assert request["headers"]["Prefer"] == "transient"
+        assert "LOWER(email) IN ('a@b.com')" in request["json"]["q"]
+        return 200, {"items": [{"id": 77, "matched": "a@b.com"}]}, {}
+
+    stub_server.routes[("POST", SUITEQL_PATH)] = suiteql
+    resolver = CustomerResolver(tba, CustomerCache(path=str(tmp_path / "customers.json")), create_missing=False)
+
+    orders = [resolver.apply(m) for m in ({"entity": "A@b.com"}, {"entity": "a@b.com"})]
+
+    assert [o["entity"] for o in orders] == ["77", "77"]
+    assert len(stub_server.requests) == 1
+    assert verify_oauth1(stub_server.requests[0], stub_server.url)
+
+
+def test_api_base_url_requires_account_or_base_url(monkeypatch):
+    monkeypatch.setattr(Config, "NS_REST_BASE_URL", "")
+    monkeypatch.setattr(Config, "NS_ACCOUNT_ID", "")
+    monkeypatch.setattr(Config, "NS_ACCESS_TOKEN", "token")
+    assert not netsuite_rest.has_api_credentials()
+    with pytest.raises(ValueError):
+        netsuite_rest.api_base_url()
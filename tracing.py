@@ -0,0 +1,206 @@
+"""
+Lightweight per-phase timing spans for every script.
+
+    @traced("wp.open_entry", entry_arg="entry_id")
+    def open_entry_by_id(driver, entry_id): ...
+
+    with span("wp.write", entry_id=entry_id) as s:
+        ...
+        s.tag(outcome="empty")
+
+- Enabled with TRACE_ENABLED=True; when disabled `traced` returns the
+  function itself and `span` returns a shared no-op object, so the cost is
+  one attribute check per `with`
+- Each span records name, start time, duration, entry id, outcome (ok,
+  error or a value set by the caller/outcome function), parent span and the
+  script name
+- Spans are appended to TRACE_FILE as JSON lines, and per-span totals are
+  written to a Prometheus textfile (<TRACE_PROM_DIR>/wp_agent_<script>.prom)
+  for the node_exporter textfile collector, when the process exits
+"""
+import atexit
+import functools
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config import Config
+
+
+ENABLED = Config.TRACE_ENABLED
+FLUSH_EVERY = 500  # spans buffered before they are appended to TRACE_FILE
+
+_trace_id = uuid.uuid4().hex[:16]
+_script = os.path.splitext(os.path.basename(sys.argv[0] or "python"))[0] or "python"
+_lock = threading.Lock()
+_local = threading.local()
+_buffer: List[Dict] = []
+_totals: Dict[Tuple[str, str], List[float]] = {}  # (span, outcome) -> [count, seconds]
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+    def tag(self, **tags) -> None:
+        pass
+
+
+_NOOP = _NoopSpan()
+
+
+class Span:
+    __slots__ = ("name", "tags", "span_id", "parent_id", "wall", "start")
+
+    def __init__(self, name: str, tags: Dict):
+        self.name = name
+        self.tags = tags
+
+    def tag(self, **tags) -> None:
+        self.tags.update(tags)
+
+    def __enter__(self) -> "Span":
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        self.parent_id = stack[-1] if stack else ""
+        self.span_id = uuid.uuid4().hex[:8]
+        stack.append(self.span_id)
+        self.wall = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        duration = time.perf_counter() - self.start
+        _local.stack.pop()
+        outcome = self.tags.pop("outcome", None) or ("error" if exc_type else "ok")
+        record = {
+            "trace_id": _trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "script": _script,
+            "name": self.name,
+            "start": round(self.wall, 6),
+            "duration": round(duration, 6),
+            "outcome": outcome,
+        }
+        if exc_type is not None:
+            record["error"] = f"{exc_type.__name__}: {exc}"[:300]
+        for key, value in self.tags.items():
+            record[key] = str(value)
+        _record(record)
+        return False
+
+
+def span(name: str, **tags):
+    if not ENABLED:
+        return _NOOP
+    return Span(name, tags)
+
+
+def traced(name: str, entry_arg: str = "", outcome: Optional[Callable[[object], str]] = None):
+    """Decorator form of `span`; a no-op at import time when tracing is disabled.
+
+    entry_arg names the parameter tagged as entry_id; outcome maps the return
+    value to an outcome string (e.g. "timeout" for an empty result).
+    """
+    def decorate(fn: Callable) -> Callable:
+        if not ENABLED:
+            return fn
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            tags = {}
+            if entry_arg:
+                bound = signature.bind_partial(*args, **kwargs)
+                if entry_arg in bound.arguments:
+                    tags["entry_id"] = bound.arguments[entry_arg]
+            with Span(name, tags) as s:
+                result = fn(*args, **kwargs)
+                if outcome is not None:
+                    s.tag(outcome=outcome(result))
+                return result
+
+        return wrapper
+
+    return decorate
+
+
+def _record(record: Dict) -> None:
+    with _lock:
+        _buffer.append(record)
+        total = _totals.setdefault((record["name"], record["outcome"]), [0, 0.0])
+        total[0] += 1
+        total[1] += record["duration"]
+        if len(_buffer) >= FLUSH_EVERY:
+            _flush_spans()
+
+
+def _resolve(path: str) -> str:
+    if os.path.isabs(path):
+        return path
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), path)
+
+
+def _flush_spans() -> None:
+    if not _buffer or not Config.TRACE_FILE:
+        _buffer.clear()
+        return
+    with open(_resolve(Config.TRACE_FILE), "a", encoding="utf-8") as f:
+        for record in _buffer:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    _buffer.clear()
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text() -> str:
+    lines = [
+        "# HELP wp_agent_span_seconds Time spent in each traced phase.",
+        "# TYPE wp_agent_span_seconds summary",
+    ]
+    script = _escape(_script)
+    for (name, outcome), (count, seconds) in sorted(_totals.items()):
+        labels = f'script="{script}",span="{_escape(name)}",outcome="{_escape(outcome)}"'
+        lines.append(f"wp_agent_span_seconds_sum{{{labels}}} {seconds:.6f}")
+        lines.append(f"wp_agent_span_seconds_count{{{labels}}} {count}")
+    lines.append("# HELP wp_agent_last_run_timestamp_seconds When the script last exited.")
+    lines.append("# TYPE wp_agent_last_run_timestamp_seconds gauge")
+    lines.append(f'wp_agent_last_run_timestamp_seconds{{script="{script}"}} {time.time():.0f}')
+    return "\n".join(lines) + "\n"
+
+
+def _write_prometheus() -> None:
+    if not Config.TRACE_PROM_DIR or not _totals:
+        return
+    prom_dir = _resolve(Config.TRACE_PROM_DIR)
+    os.makedirs(prom_dir, exist_ok=True)
+    path = os.path.join(prom_dir, f"wp_agent_{_script}.prom")
+    # Write then rename so the collector never reads a half-written file
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(prometheus_text())
+    os.replace(tmp_path, path)
+
+
+def flush() -> None:
+    with _lock:
+        _flush_spans()
+        _write_prometheus()
+
+
+if ENABLED:
+    atexit.register(flush)
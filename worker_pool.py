@@ -0,0 +1,114 @@
+"""
+Parallel entry extraction with a pool of Chrome workers.
+
+- One driver logs in (cached session reused when valid); its cookies are
+  copied into every other worker so the pool shares one WordPress session.
+- Workers pull (index, entry_id) items from a shared queue and extract them
+  with batch_export.extract_entry_with_retry; a worker whose Chrome crashes
+  gets a new one with the shared cookies.
+- Results are yielded in the original input order as soon as the next one
+  is available.
+"""
+import queue
+import threading
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from config import Config
+from batch_export import extract_entry_with_retry
+from login_agent import build_driver
+from retry import DriverSession
+from session_store import login_with_session
+
+
+_WORKER_DONE = -1
+
+
+def _quit(driver) -> None:
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+def _worker(driver, cookies: Optional[List[Dict]], work: "queue.Queue", done: "queue.Queue", mode: str) -> None:
+    browser = DriverSession(driver, cookies)
+    try:
+        browser.start()
+    except Exception as e:
+        print(f"Worker failed to start: {e}")
+        browser.quit()
+        done.put((_WORKER_DONE, "", {}))
+        return
+    try:
+        while True:
+            try:
+                index, entry_id = work.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                record = extract_entry_with_retry(browser, entry_id, mode)
+            except Exception as e:
+                print(f"Entry {entry_id} failed: {e}")
+                record = {}
+            done.put((index, entry_id, record))
+    finally:
+        browser.quit()
+        done.put((_WORKER_DONE, "", {}))
+
+
+def export_entries_parallel(
+    entry_ids: Iterable[str],
+    workers: int = 0,
+    mode: str = "text",
+) -> Iterator[Tuple[str, Dict[str, str]]]:
+    entry_ids = list(entry_ids)
+    if not entry_ids:
+        return
+    workers = max(1, min(workers or Config.WORKER_COUNT, Config.WORKER_COUNT, len(entry_ids)))
+
+    work: "queue.Queue" = queue.Queue()
+    for index, entry_id in enumerate(entry_ids):
+        work.put((index, entry_id))
+    done: "queue.Queue" = queue.Queue()
+
+    # Log in once on the first worker's driver and share its cookies
+    leader = build_driver(headless=Config.HEADLESS_MODE)
+    try:
+        login_with_session(leader)
+        cookies = leader.get_cookies()
+    except Exception:
+        _quit(leader)
+        raise
+
+    threads = [threading.Thread(target=_worker, args=(leader, None, work, done, mode), daemon=True)]
+    for _ in range(workers - 1):
+        threads.append(threading.Thread(target=_worker, args=(None, cookies, work, done, mode), daemon=True))
+    for t in threads:
+        t.start()
+
+    pending: Dict[int, Tuple[str, Dict[str, str]]] = {}
+    next_index = 0
+    alive = len(threads)
+    while next_index < len(entry_ids):
+        if alive == 0:
+            # Every worker is gone; report whatever is left as failures
+            while True:
+                try:
+                    index, entry_id = work.get_nowait()
+                except queue.Empty:
+                    break
+                pending[index] = (entry_id, {})
+            for index in range(next_index, len(entry_ids)):
+                pending.setdefault(index, (entry_ids[index], {}))
+        else:
+            index, entry_id, record = done.get()
+            if index == _WORKER_DONE:
+                alive -= 1
+                continue
+            pending[index] = (entry_id, record)
+        while next_index in pending:
+            yield pending.pop(next_index)
+            next_index += 1
+
+    for t in threads:
+        t.join(timeout=5)